@@ -10,7 +10,7 @@ __version__ = "1.0.0"
 from .computer_use_refactored import ComputerUseRefactored
 from .computer_use_core import ComputerUseCore  # Backward compatibility wrapper
 from .factory_refactored import create_computer_use, create_computer_use_for_testing
-from .safety_checks import SafetyChecker
+from .safety_checks import SafetyBlocked, SafetyChecker
 from .visual_analyzer import VisualAnalyzer
 
 # Import original components
@@ -104,6 +104,7 @@ __all__ = [
     
     # Original exports
     'SafetyChecker',
+    'SafetyBlocked',
     'VisualAnalyzer',
     'VisualMode',
     'ClaudeComputerUse',
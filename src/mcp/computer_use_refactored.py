@@ -6,6 +6,7 @@ This version eliminates test_mode and uses proper dependency injection
 with clean abstractions for all platform-specific functionality.
 """
 
+import functools
 import logging
 from typing import Dict, Any, Optional, Tuple, List
 
@@ -17,6 +18,21 @@ from .visual_analyzer import VisualAnalyzer
 
 logger = logging.getLogger(__name__)
 
+# Named keys accepted by key_press, plus modifier-combo prefixes
+VALID_KEYS = frozenset([
+    'Return', 'Tab', 'Escape', 'BackSpace', 'Delete',
+    'Up', 'Down', 'Left', 'Right', 'Home', 'End',
+    'Page_Up', 'Page_Down', 'F1-F12', 'ctrl+a', 'ctrl+c',
+    'ctrl+v', 'ctrl+x', 'ctrl+z', 'ctrl+y', 'alt+tab',
+])
+MODIFIER_PREFIXES = ('ctrl+', 'alt+', 'shift+')
+
+
+@functools.lru_cache(maxsize=256)
+def _is_valid_key(key: str) -> bool:
+    """Key validation; key presses repeat a small set of hotkeys"""
+    return key in VALID_KEYS or key.startswith(MODIFIER_PREFIXES)
+
 
 class ComputerUseRefactored:
     """
@@ -185,12 +201,7 @@ class ComputerUseRefactored:
         """Press a key"""
         try:
             # Validate key
-            valid_keys = ['Return', 'Tab', 'Escape', 'BackSpace', 'Delete',
-                         'Up', 'Down', 'Left', 'Right', 'Home', 'End',
-                         'Page_Up', 'Page_Down', 'F1-F12', 'ctrl+a', 'ctrl+c',
-                         'ctrl+v', 'ctrl+x', 'ctrl+z', 'ctrl+y', 'alt+tab']
-            
-            if key not in valid_keys and not any(key.startswith(prefix) for prefix in ['ctrl+', 'alt+', 'shift+']):
+            if not _is_valid_key(key):
                 return {
                     'success': False,
                     'error': f'Invalid key: {key}'
@@ -137,9 +137,10 @@ class EnhancedComputerUse:
         self.metrics_middleware = MetricsMiddleware()
         self.middleware_instance.add_middleware(self.metrics_middleware)
         
-        # Retry for transient failures
+        # Retry for transient failures, first retry after ~0.1s
         self.middleware_instance.add_middleware(
-            RetryMiddleware(max_retries=3, retry_delay=1.0)
+            RetryMiddleware(max_retries=3,
+                            backoff=ExponentialBackoff(base_delay=0.1, max_delay=1.0))
         )
     
     def _setup_error_handlers(self):
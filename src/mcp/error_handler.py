@@ -35,14 +35,16 @@ class ComputerUseErrorHandler:
         
         self.error_history.append(error_info)
         
-        # Determine error type and handle appropriately
-        if 'screenshot' in str(context).lower():
+        # Determine error type and handle appropriately; the context is
+        # stringified once for all of the checks
+        context_text = str(context).lower()
+        if 'screenshot' in context_text:
             return self.handle_screenshot_error(error)
-        elif 'click' in str(context).lower():
+        elif 'click' in context_text:
             return self.handle_click_error(error, 
                                            context.get('x', 0), 
                                            context.get('y', 0))
-        elif 'type' in str(context).lower():
+        elif 'type' in context_text:
             return self.handle_type_error(error)
         else:
             return self.handle_generic_error(error)
@@ -58,10 +60,11 @@ class ComputerUseErrorHandler:
         }
         
         # Determine fallback based on error type
-        if 'display' in str(error).lower():
+        message = str(error).lower()
+        if 'display' in message:
             response['suggestion'] = "No display available. Using text-only mode."
             response['recovery'] = "Set up X server or use WSL2 with X forwarding"
-        elif 'permission' in str(error).lower():
+        elif 'permission' in message:
             response['suggestion'] = "Permission denied. Check display access."
             response['recovery'] = "Run with appropriate permissions or check DISPLAY variable"
         else:
@@ -84,12 +87,13 @@ class ComputerUseErrorHandler:
         }
         
         # Provide alternatives
-        if 'not found' in str(error).lower():
+        message = str(error).lower()
+        if 'not found' in message:
             response['alternative'] = {
                 'action': 'search_element',
                 'suggestion': 'Element may have moved. Try screenshot first.'
             }
-        elif 'timeout' in str(error).lower():
+        elif 'timeout' in message:
             response['alternative'] = {
                 'action': 'wait_and_retry',
                 'suggestion': 'Page may be loading. Wait and retry.'
@@ -111,10 +115,11 @@ class ComputerUseErrorHandler:
             'error': str(error)
         }
         
-        if 'focus' in str(error).lower():
+        message = str(error).lower()
+        if 'focus' in message:
             response['suggestion'] = "No input field focused. Click on field first."
             response['recovery'] = {'action': 'click_then_type'}
-        elif 'clipboard' in str(error).lower():
+        elif 'clipboard' in message:
             response['suggestion'] = "Clipboard access failed. Type character by character."
             response['recovery'] = {'action': 'character_input'}
         else:
@@ -134,11 +139,12 @@ class ComputerUseErrorHandler:
         }
         
         # Provide safe alternatives
-        if 'delete' in str(violation).lower():
+        violation_text = str(violation).lower()
+        if 'delete' in violation_text:
             response['suggestion'] = "Instead of deleting, consider moving to trash or archiving"
-        elif 'password' in str(violation).lower():
+        elif 'password' in violation_text:
             response['suggestion'] = "Never automate password entry. Use secure credential manager."
-        elif 'sensitive' in str(violation).lower():
+        elif 'sensitive' in violation_text:
             response['suggestion'] = "Sensitive data detected. Mask or redact before proceeding."
         else:
             response['suggestion'] = "Action blocked for safety. Review and modify command."
@@ -13,6 +13,36 @@ from ..safety_checks import SafetyChecker
 
 logger = logging.getLogger(__name__)
 
+# SendKeys escapes, applied in one str.translate pass
+_SENDKEYS_ESCAPES = str.maketrans({
+    '{': '{{', '}': '}}',
+    '+': '{+}', '^': '{^}',
+    '%': '{%}', '~': '{~}',
+    '(': '{(}', ')': '{)}',
+})
+
+# xdotool-style key names -> SendKeys codes for the PowerShell fallback
+_SENDKEYS_KEY_MAP = {
+    'Return': '{ENTER}',
+    'Tab': '{TAB}',
+    'Escape': '{ESC}',
+    'Space': ' ',
+    'BackSpace': '{BACKSPACE}',
+    'Delete': '{DELETE}',
+    'Up': '{UP}',
+    'Down': '{DOWN}',
+    'Left': '{LEFT}',
+    'Right': '{RIGHT}',
+    'Home': '{HOME}',
+    'End': '{END}',
+    'Page_Up': '{PGUP}',
+    'Page_Down': '{PGDN}',
+    'ctrl': '^',
+    'alt': '%',
+    'shift': '+',
+    'cmd': '^{ESC}',  # Windows key
+}
+
 
 class WindowsInput:
     """Native Windows input using ctypes"""
@@ -441,10 +471,7 @@ class WSL2Input:
             raise Exception(f"Safety check failed: {self.safety_checker.last_error}")
         
         # Escape special characters for SendKeys
-        escaped_text = text.replace('{', '{{').replace('}', '}}')
-        escaped_text = escaped_text.replace('+', '{+}').replace('^', '{^}')
-        escaped_text = escaped_text.replace('%', '{%}').replace('~', '{~}')
-        escaped_text = escaped_text.replace('(', '{(}').replace(')', '{)}')
+        escaped_text = text.translate(_SENDKEYS_ESCAPES)
         
         ps_script = f'''
         Add-Type -AssemblyName System.Windows.Forms
@@ -570,39 +597,9 @@ class WSL2Input:
     
     def key_press(self, key: str) -> Dict[str, Any]:
         """Press a key or key combination via PowerShell"""
-        # Parse key combination
-        keys = key.split('+')
-        
-        # Map special keys
-        key_map = {
-            'Return': '{ENTER}',
-            'Tab': '{TAB}',
-            'Escape': '{ESC}',
-            'Space': ' ',
-            'BackSpace': '{BACKSPACE}',
-            'Delete': '{DELETE}',
-            'Up': '{UP}',
-            'Down': '{DOWN}',
-            'Left': '{LEFT}',
-            'Right': '{RIGHT}',
-            'Home': '{HOME}',
-            'End': '{END}',
-            'Page_Up': '{PGUP}',
-            'Page_Down': '{PGDN}',
-            'ctrl': '^',
-            'alt': '%',
-            'shift': '+',
-            'cmd': '^{ESC}',  # Windows key
-        }
-        
-        # Build SendKeys string
-        sendkeys_str = ''
-        for k in keys:
-            k = k.strip()
-            if k in key_map:
-                sendkeys_str += key_map[k]
-            else:
-                sendkeys_str += k.lower()
+        # Build SendKeys string from the key combination
+        parts = [k.strip() for k in key.split('+')]
+        sendkeys_str = ''.join([_SENDKEYS_KEY_MAP.get(k) or k.lower() for k in parts])
         
         ps_script = f'''
         Add-Type -AssemblyName System.Windows.Forms
@@ -68,11 +68,13 @@ class X11Input:
     def drag(self, start_x: int, start_y: int, end_x: int, end_y: int) -> Dict[str, Any]:
         """Click and drag"""
         try:
-            subprocess.run(['xdotool', 'mousemove', str(start_x), str(start_y)], check=True)
-            subprocess.run(['xdotool', 'mousedown', '1'], check=True)
-            time.sleep(0.05)
-            subprocess.run(['xdotool', 'mousemove', str(end_x), str(end_y)], check=True)
-            subprocess.run(['xdotool', 'mouseup', '1'], check=True)
+            # One chained xdotool process instead of one per step
+            subprocess.run(['xdotool',
+                            'mousemove', str(start_x), str(start_y),
+                            'mousedown', '1',
+                            'sleep', '0.05',
+                            'mousemove', str(end_x), str(end_y),
+                            'mouseup', '1'], check=True)
             
             return {
                 'success': True,
@@ -89,9 +91,10 @@ class X11Input:
         button = '5' if direction == 'down' else '4'
         
         try:
-            for _ in range(amount):
-                subprocess.run(['xdotool', 'click', button], check=True)
-                time.sleep(0.05)
+            # xdotool repeats the wheel click itself, keeping the 50ms spacing
+            if amount > 0:
+                subprocess.run(['xdotool', 'click', '--repeat', str(amount), '--delay', '50', button],
+                               check=True)
             
             return {
                 'success': True,
@@ -4,23 +4,400 @@ MCP Server for Computer Use
 Provides computer use capabilities as native Claude tools via MCP protocol
 """
 
+import codecs
 import json
 import sys
 import os
 import base64
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import Dict, Any, List, Optional
 
-from .factory_refactored import create_computer_use
-from .safety_checks import SafetyChecker
+from .safety_checks import SafetyBlocked, SafetyChecker
 from .visual_analyzer import VisualAnalyzer
 
+# orjson is an optional, much faster encoder for the request/response path
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# jsonschema validates tool arguments against each tool's inputSchema
+try:
+    from jsonschema import Draft7Validator
+    from jsonschema.exceptions import best_match
+except ImportError:
+    Draft7Validator = None
+
 # Simple stderr logging for debugging
 def log(message):
     """Simple logging to stderr for debugging"""
     print(f"[MCP] {message}", file=sys.stderr)
 
 
+# Stdlib fallbacks, built once with compact separators to match orjson output
+_JSON_ENCODER = json.JSONEncoder(separators=(',', ':'))
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _dumps(obj: Any) -> str:
+    """Encode JSON with orjson when installed, else the stdlib"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            # e.g. integers beyond 64 bits; the stdlib handles them
+            pass
+    return _JSON_ENCODER.encode(obj)
+
+
+def _write_stdout(text: str) -> None:
+    """Write response lines as UTF-8 whatever the console encoding is
+    
+    orjson output is not ASCII-escaped, so it cannot go through a cp1252
+    (or other non-UTF-8) text layer.
+    """
+    stdout = sys.stdout
+    encoding = getattr(stdout, "encoding", None)
+    buffer = getattr(stdout, "buffer", None)
+    if isinstance(encoding, str) and buffer is not None and codecs.lookup(encoding).name != "utf-8":
+        stdout.flush()
+        buffer.write(text.encode("utf-8"))
+        buffer.flush()
+    else:
+        stdout.write(text)
+        stdout.flush()
+
+
+def _to_int(value: Any) -> int:
+    """int() that passes plain ints through untouched"""
+    return value if type(value) is int else int(value)
+
+
+def _loads(data):
+    """Decode JSON with orjson when installed (raises json.JSONDecodeError either way)"""
+    if orjson is not None:
+        return orjson.loads(data)
+    if isinstance(data, (bytes, bytearray)):
+        data = data.decode('utf-8')
+    return _JSON_DECODER.decode(data)
+
+
+def _static_result_key(request: Any) -> Optional[str]:
+    """Key of a request in ComputerUseServer._static_result_json"""
+    if not isinstance(request, dict):
+        return None
+    method = request.get("method")
+    if method == "resources/read":
+        params = request.get("params")
+        uri = params.get("uri") if isinstance(params, dict) else None
+        return f"resources/read {uri}" if isinstance(uri, str) else None
+    return method if isinstance(method, str) else None
+
+
+# Distinguishes an absent request field from an explicit null
+_MISSING = object()
+
+# JSON-RPC envelopes; only the id and the payload vary per response
+_RESULT_ENVELOPE = '{{"jsonrpc":"2.0","id":{id},"result":{result}}}'
+_ERROR_ENVELOPE = '{{"jsonrpc":"2.0","id":{id},"error":{{"code":{code},"message":{message}}}}}'
+
+# Invalid JSON has no id to echo, so its response line never changes
+_PARSE_ERROR_LINE = _JSON_ENCODER.encode({
+    "jsonrpc": "2.0",
+    "id": None,
+    "error": {"code": -32700, "message": "Parse error"}
+}) + "\n"
+
+# JSON-RPC method -> ComputerUseServer handler taking (params, request_id)
+METHOD_HANDLERS = {
+    "initialize": "_dispatch_initialize",
+    "tools/list": "_dispatch_list_tools",
+    "tools/call": "_dispatch_call_tool",
+    "resources/list": "_dispatch_list_resources",
+    "resources/read": "_dispatch_read_resource"
+}
+
+# Tool name -> ComputerUseServer handler taking the tool arguments. Handlers
+# are looked up by name so instance-level overrides and mocks still apply.
+TOOL_HANDLERS = {
+    "screenshot": "handle_screenshot",
+    "click": "handle_click",
+    "type": "handle_type",
+    "key": "handle_key",
+    "scroll": "handle_scroll",
+    "drag": "handle_drag",
+    "wait": "handle_wait",
+    "automate": "handle_automate",
+    "install_xserver": "handle_install_xserver",
+    "start_xserver": "handle_start_xserver",
+    "stop_xserver": "handle_stop_xserver",
+    "setup_wsl_xforwarding": "handle_setup_wsl_xforwarding",
+    "xserver_status": "handle_xserver_status",
+    "test_display": "handle_test_display",
+    # Windows Server tools
+    "detect_windows_server": "handle_detect_windows_server",
+    "get_server_info": "handle_get_server_info",
+    "check_server_core": "handle_check_server_core",
+    "check_rdp_session": "handle_check_rdp_session",
+    "get_server_capabilities": "handle_get_server_capabilities",
+    "suggest_alternatives": "handle_suggest_alternatives",
+    # VcXsrv tools
+    "detect_vcxsrv": "handle_detect_vcxsrv",
+    "start_vcxsrv": "handle_start_vcxsrv",
+    "get_vcxsrv_status": "handle_get_vcxsrv_status",
+    "test_x11_display": "handle_test_x11_display",
+    "get_vcxsrv_capabilities": "handle_get_vcxsrv_capabilities",
+    "install_vcxsrv_guide": "handle_install_vcxsrv_guide",
+    # Platform detection tools
+    "get_platform_info": "handle_get_platform_info",
+    "get_recommended_methods": "handle_get_recommended_methods",
+    "check_display_available": "handle_check_display_available"
+}
+
+# Side-effect-free tools that skip the safety check and analysis logging
+FAST_PATH_TOOLS = frozenset([
+    "get_platform_info", "get_recommended_methods", "check_display_available", "wait"
+])
+
+# Read-only tools a batch may run concurrently; every other tool (and a
+# screenshot with save_path) is a barrier that runs alone, after everything
+# before it and before anything after it
+CONCURRENT_SAFE_TOOLS = frozenset([
+    "screenshot", "xserver_status", "test_display",
+    "detect_windows_server", "get_server_info", "check_server_core",
+    "check_rdp_session", "get_server_capabilities", "suggest_alternatives",
+    "detect_vcxsrv", "get_vcxsrv_status", "test_x11_display",
+    "get_vcxsrv_capabilities", "install_vcxsrv_guide",
+    "get_platform_info", "get_recommended_methods", "check_display_available"
+])
+
+# drag tool arguments, in computer.drag() order
+DRAG_COORDINATES = ("start_x", "start_y", "end_x", "end_y")
+
+# Accepted scroll tool directions
+SCROLL_DIRECTIONS = frozenset(["up", "down"])
+
+# Methods that only exist on their own platform, reported in method_details
+PLATFORM_SPECIFIC_SCREENSHOT_METHODS = frozenset(["windows_native", "macos_screencapture"])
+PLATFORM_SPECIFIC_INPUT_METHODS = frozenset(["windows_native"])
+
+# Bytes requested from stdin per read in stdio mode
+STDIN_READ_SIZE = 65536
+
+# Platform-dependent resources are re-rendered at most this often
+RESOURCE_CACHE_TTL = 30.0
+
+# Static resource catalogue and guide texts, shared by every request
+RESOURCES = [
+    {
+        "uri": "platform://capabilities",
+        "name": "Platform Capabilities",
+        "description": "Current platform capabilities and limitations",
+        "mimeType": "application/json"
+    },
+    {
+        "uri": "guide://vcxsrv-install",
+        "name": "VcXsrv Installation Guide", 
+        "description": "Step-by-step VcXsrv installation guide",
+        "mimeType": "text/markdown"
+    },
+    {
+        "uri": "guide://windows-server-setup",
+        "name": "Windows Server Setup Guide",
+        "description": "Windows Server automation setup guide",
+        "mimeType": "text/markdown"
+    },
+    {
+        "uri": "troubleshooting://display-issues",
+        "name": "Display Issues Troubleshooting",
+        "description": "Common display and screenshot issues",
+        "mimeType": "text/markdown"
+    },
+    {
+        "uri": "config://platform-defaults",
+        "name": "Platform Default Configuration",
+        "description": "Default configuration for current platform",
+        "mimeType": "application/json"
+    }
+]
+
+VCXSRV_INSTALL_GUIDE = """# VcXsrv Installation Guide
+
+## Overview
+VcXsrv is an X11 server for Windows that enables running Linux GUI applications.
+
+## Installation Steps
+
+1. **Download VcXsrv**
+   - Visit: https://sourceforge.net/projects/vcxsrv/
+   - Download the latest installer
+
+2. **Run Installer**
+   - Run as Administrator
+   - Follow installation wizard
+   - Use default settings
+
+3. **Launch XLaunch**
+   - Start XLaunch from Start Menu
+   - Configure display settings:
+     - Multiple windows mode (recommended)
+     - Display number: 0
+     - Enable clipboard sharing
+     - Disable access control (-ac)
+
+4. **Windows Firewall**
+   - Allow VcXsrv through Windows Firewall when prompted
+   - Both Private and Public networks
+
+## WSL2 Setup
+
+1. **Get Windows Host IP**
+   ```bash
+   export DISPLAY=$(cat /etc/resolv.conf | grep nameserver | awk '{print $2}'):0.0
+   ```
+
+2. **Test Connection**
+   ```bash
+   xeyes  # Should show eyes that follow mouse
+   ```
+
+## Troubleshooting
+
+- **Connection refused**: Check Windows Firewall
+- **No display**: Verify DISPLAY variable
+- **Black screen**: Try different display modes
+"""
+
+WINDOWS_SERVER_SETUP_GUIDE = """# Windows Server Automation Setup
+
+## Server Editions Supported
+
+- **Windows Server 2022** ✅ Full support
+- **Windows Server 2019** ✅ Full support  
+- **Windows Server 2016** ✅ Full support
+- **Windows Server Core** ⚠️ Limited GUI (use VcXsrv)
+
+## Setup by Environment
+
+### Windows Server with GUI
+- **Screenshot**: Native Windows GDI
+- **Input**: Native SendInput API
+- **Setup**: No additional setup required
+
+### Windows Server Core
+- **Screenshot**: Not available (no GUI)
+- **Alternatives**:
+  1. Install VcXsrv for X11 GUI
+  2. Use PowerShell automation
+  3. Use Windows Admin Center
+
+### RDP Sessions
+- **Screenshot**: RDP-aware capture
+- **Limitations**: Captures RDP window only
+- **Best Practice**: Use native tools on RDP client
+
+## PowerShell Automation (Server Core)
+
+```powershell
+# Service management
+Get-Service | Where-Object {$_.Status -eq "Running"}
+Restart-Service -Name "ServiceName"
+
+# File operations
+Get-ChildItem -Path C:\\ -Recurse -Filter "*.log"
+Copy-Item -Path "source" -Destination "dest" -Recurse
+
+# Network configuration
+Get-NetAdapter | Select-Object Name, Status, LinkSpeed
+```
+
+## VcXsrv on Server Core
+
+1. **Install VcXsrv on Windows client machine**
+2. **Configure remote access**
+3. **Set DISPLAY variable**
+4. **Test with simple X11 applications**
+"""
+
+DISPLAY_TROUBLESHOOTING_GUIDE = """# Display & Screenshot Troubleshooting
+
+## Common Issues
+
+### Black/Empty Screenshots
+
+**WSL2 Environment:**
+- **Cause**: X11 captures virtual display buffer
+- **Solution**: Use PowerShell bridge for Windows desktop capture
+
+**Server Core:**
+- **Cause**: No GUI available
+- **Solution**: Install VcXsrv or use PowerShell automation
+
+### Permission Errors
+
+**Linux:**
+- **Cause**: No access to X11 display
+- **Solution**: `xhost +local:` or proper DISPLAY variable
+
+**Windows:**
+- **Cause**: Insufficient privileges
+- **Solution**: Run as Administrator
+
+### Performance Issues
+
+**Large Screenshots:**
+- **Solution**: Use region capture instead of full screen
+- **Example**: `screenshot(region={'x': 0, 'y': 0, 'width': 800, 'height': 600})`
+
+**Slow Capture:**
+- **Solution**: Check system resources and display drivers
+
+### Network Issues (Remote)
+
+**RDP Sessions:**
+- **Issue**: Multi-monitor confusion
+- **Solution**: Use single monitor RDP or specify monitor
+
+**VcXsrv Remote:**
+- **Issue**: Firewall blocking X11
+- **Solution**: Configure Windows Firewall rules
+
+## Environment-Specific Solutions
+
+| Environment | Issue | Solution |
+|-------------|-------|----------|
+| WSL2 | Black screenshots | Use `wsl2_powershell` method |
+| Server Core | No screenshots | Install VcXsrv or use PowerShell |
+| RDP | Partial capture | Use RDP-aware methods |
+| VcXsrv | Connection refused | Check firewall and DISPLAY |
+
+## Diagnostic Commands
+
+```bash
+# Test X11 connectivity
+xset q
+
+# Check display variable
+echo $DISPLAY
+
+# Test screenshot tools
+scrot test.png
+import -window root test.png
+
+# Windows PowerShell test
+powershell -Command "Add-Type -AssemblyName System.Windows.Forms; [System.Windows.Forms.Screen]::PrimaryScreen"
+```
+"""
+
+
+
+class UnknownToolError(ValueError):
+    """Raised when a tool call names a tool this server does not define"""
+
+
 class ComputerUseServer:
     """MCP Server providing computer use tools"""
     
@@ -32,19 +409,68 @@ class ComputerUseServer:
                          creates a default instance for the current platform.
         """
         self.protocol_version = "2024-11-05"
-        # Use injected instance or create default
-        if computer_use:
-            self.computer = computer_use
-        else:
-            from .factory_refactored import create_computer_use
-            self.computer = create_computer_use()
+        # Use injected instance or create default on first tool call, so
+        # initialize/tools/list handshakes skip platform detection
+        self._computer = computer_use or None
+        self._computer_lock = threading.Lock()
         self.safety_checker = SafetyChecker()
         self.visual = VisualAnalyzer()
         # Keep aliases for backward compatibility
         self.safety = self.safety_checker
         self.ultrathink = self.visual
         self.tools = self._define_tools()
+        # tool name -> compiled inputSchema validator, checked before any handler runs
+        self._argument_validators = {
+            tool["name"]: Draft7Validator(tool["inputSchema"])
+            for tool in self.tools
+        } if Draft7Validator is not None else {}
+        # Without jsonschema only explicit nulls for required arguments are caught
+        self._required_arguments = {
+            tool["name"]: tuple(tool["inputSchema"].get("required", ()))
+            for tool in self.tools
+        }
+        # Static results are built and JSON-encoded once; responses only
+        # differ in their id
+        self._initialize_result = self._build_initialize_result()
+        self._tools_result = {"tools": self.tools}
+        self._resources_result = {"resources": RESOURCES}
+        self._guide_results = {
+            uri: {"contents": [{"type": "text", "text": text}]}
+            for uri, text in (
+                ("guide://vcxsrv-install", self._get_vcxsrv_install_guide()),
+                ("guide://windows-server-setup", self._get_windows_server_setup_guide()),
+                ("troubleshooting://display-issues", self._get_display_troubleshooting()),
+            )
+        }
+        # method (or "resources/read <uri>") -> encoded JSON of its static result
+        self._static_result_json = {
+            "initialize": _dumps(self._initialize_result),
+            "tools/list": _dumps(self._tools_result),
+            "resources/list": _dumps(self._resources_result),
+        }
+        self._static_result_json.update(
+            (f"resources/read {uri}", _dumps(result))
+            for uri, result in self._guide_results.items()
+        )
+        # uri -> (timestamp, text) for the platform-dependent resources
+        self._resource_cache: Dict[str, Any] = {}
+        # Directories already created for screenshot save_path targets
+        self._screenshot_dirs: set = set()
         
+    @property
+    def computer(self):
+        """ComputerUse instance, created for the current platform on first use"""
+        if self._computer is None:
+            with self._computer_lock:
+                if self._computer is None:
+                    from .factory_refactored import create_computer_use
+                    self._computer = create_computer_use()
+        return self._computer
+    
+    @computer.setter
+    def computer(self, value):
+        self._computer = value
+    
     def _define_tools(self) -> List[Dict[str, Any]]:
         """Define available MCP tools"""
         return [
@@ -62,13 +488,13 @@ class ComputerUseServer:
                             "type": "string",
                             "description": "Screenshot method to use",
                             "enum": [
+                                "recommended",
                                 "windows_native",
                                 "windows_rdp_capture", 
                                 "wsl2_powershell",
                                 "x11",
                                 "vcxsrv_x11",
-                                "server_core",
-                                "macos_screencapture"
+                                "server_core"
                             ],
                             "default": "recommended"
                         },
@@ -428,18 +854,62 @@ class ComputerUseServer:
                     "type": "object",
                     "properties": {}
                 }
+            },
+            # Batching
+            {
+                "name": "batch_execute",
+                "description": "Run several tool calls in one request",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "operations": {
+                            "type": "array",
+                            "description": "Tool calls to run, in order",
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "name": {
+                                        "type": "string",
+                                        "description": "Tool name"
+                                    },
+                                    "arguments": {
+                                        "type": "object",
+                                        "description": "Tool arguments"
+                                    }
+                                },
+                                "required": ["name"]
+                            }
+                        },
+                        "maxConcurrent": {
+                            "type": "integer",
+                            "default": 1,
+                            "description": "Maximum consecutive read-only operations run at once; other operations run alone, in order"
+                        },
+                        "stopOnError": {
+                            "type": "boolean",
+                            "default": False,
+                            "description": "Skip remaining operations after the first failure"
+                        }
+                    },
+                    "required": ["operations"]
+                }
             }
         ]
     
 
     def _validate_request(self, request: Dict[str, Any]) -> None:
-        """Validate JSON-RPC request structure"""
+        """Validate JSON-RPC request structure, raising ValueError on the first problem"""
         if 'jsonrpc' not in request:
-            raise ValueError("Missing jsonrpc field")
+            raise ValueError("Missing 'jsonrpc' field")
         if request['jsonrpc'] != '2.0':
-            raise ValueError("Invalid jsonrpc version")
+            raise ValueError(f"Invalid jsonrpc version: {request['jsonrpc']}")
         if 'method' not in request:
-            raise ValueError("Missing method field")
+            raise ValueError("Missing 'method' field")
+        if request['method'] is None:
+            raise ValueError("Method cannot be null")
+        # A missing id marks a notification; an explicit null is invalid
+        if 'id' in request and request['id'] is None:
+            raise ValueError("ID cannot be null")
     
     def _build_error_response(self, id: Any, code: int, message: str, data: Any = None) -> Dict[str, Any]:
         """Build JSON-RPC error response"""
@@ -456,16 +926,41 @@ class ComputerUseServer:
             'error': error
         }
 
+    def _encode_response(self, response: Optional[Dict[str, Any]], static_key: Optional[str] = None) -> str:
+        """Serialize a response by filling the envelope templates
+        
+        Only the id and the payload are encoded per response; a result for
+        static_key (see _static_result_key) reuses its pre-encoded JSON.
+        """
+        if response is None or len(response) != 3:
+            return _dumps(response)
+        
+        result = response.get("result")
+        if result is not None:
+            encoded = self._static_result_json.get(static_key) if static_key is not None else None
+            if encoded is None:
+                encoded = _dumps(result)
+            return _RESULT_ENVELOPE.format(id=_dumps(response["id"]), result=encoded)
+        
+        error = response.get("error")
+        if error is not None and len(error) == 2:
+            return _ERROR_ENVELOPE.format(
+                id=_dumps(response["id"]),
+                code=_dumps(error["code"]),
+                message=_dumps(error["message"])
+            )
+        
+        return _dumps(response)
+    
     def process_request(self):
         """Process one request from stdin"""
         try:
             line = sys.stdin.readline()
             if not line:
                 return None
-            request = json.loads(line)
+            request = _loads(line)
             response = self.handle_request(request)
-            sys.stdout.write(json.dumps(response) + "\n")
-            sys.stdout.flush()
+            _write_stdout(self._encode_response(response, _static_result_key(request)) + "\n")
             return response
         except Exception as e:
             log(f"Error processing request: {e}")
@@ -473,57 +968,58 @@ class ComputerUseServer:
     
     def handle_request(self, request: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Handle incoming MCP request"""
-        # Validate JSON-RPC 2.0 structure
-        request_id = request.get("id")
-        
-        # Check for jsonrpc field
-        if "jsonrpc" not in request:
-            return self.error_response(request_id, "Missing 'jsonrpc' field")
-        
-        if request["jsonrpc"] != "2.0":
-            return self.error_response(request_id, f"Invalid jsonrpc version: {request['jsonrpc']}")
-        
-        # Check for method field
-        if "method" not in request:
-            return self.error_response(request_id, "Missing 'method' field")
-        
+        # Validate JSON-RPC 2.0 structure in one pass; only malformed
+        # requests and notifications take the detailed path
+        request_id = request.get("id", _MISSING)
         method = request.get("method")
-        if method is None:
-            return self.error_response(request_id, "Method cannot be null")
-        
-        # For non-notifications, id must be present
-        if "id" not in request:
-            # This is a notification, process but don't respond
-            return None
-        
-        # Check if id is null (test expects this to be invalid)
-        if request_id is None:
-            return self.error_response(request_id, "ID cannot be null")
+        if request_id is _MISSING or request_id is None or method is None or request.get("jsonrpc") != "2.0":
+            return self._reject_request(request)
         
         params = request.get("params", {})
         
+        handler_name = METHOD_HANDLERS.get(method) if isinstance(method, str) else None
+        if handler_name is None:
+            return self.error_response(request_id, f"Unknown method: {method}")
+        
         try:
-            if method == "initialize":
-                return self.initialize(request_id)
-            elif method == "tools/list":
-                return self.list_tools(request_id)
-            elif method == "tools/call":
-                # Validate params for tools/call
-                if method == "tools/call" and params is None:
-                    return self.error_response(request_id, "Missing params for tools/call")
-                return self.call_tool(params, request_id)
-            elif method == "resources/list":
-                return self.list_resources(request_id)
-            elif method == "resources/read":
-                if params is None:
-                    return self.error_response(request_id, "Missing params for resources/read")
-                return self.read_resource(params, request_id)
-            else:
-                return self.error_response(request_id, f"Unknown method: {method}")
+            return getattr(self, handler_name)(params, request_id)
         except Exception as e:
             log(f"Error handling request: {e}")
             return self.error_response(request_id, str(e))
     
+    def _reject_request(self, request: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Build the error for a request that failed the one-pass check
+        
+        Returns None for notifications, which get no response.
+        """
+        try:
+            self._validate_request(request)
+        except ValueError as e:
+            return self.error_response(request.get("id"), str(e))
+        
+        # Well-formed but without an id: a notification
+        return None
+    
+    def _dispatch_initialize(self, params: Any, request_id: Any) -> Dict[str, Any]:
+        return self.initialize(request_id)
+    
+    def _dispatch_list_tools(self, params: Any, request_id: Any) -> Dict[str, Any]:
+        return self.list_tools(request_id)
+    
+    def _dispatch_call_tool(self, params: Any, request_id: Any) -> Dict[str, Any]:
+        # Validate params for tools/call
+        if params is None:
+            return self.error_response(request_id, "Missing params for tools/call")
+        return self.call_tool(params, request_id)
+    
+    def _dispatch_list_resources(self, params: Any, request_id: Any) -> Dict[str, Any]:
+        return self.list_resources(request_id)
+    
+    def _dispatch_read_resource(self, params: Any, request_id: Any) -> Dict[str, Any]:
+        if params is None:
+            return self.error_response(request_id, "Missing params for resources/read")
+        return self.read_resource(params, request_id)
+    
     def handle_initialize(self, request: Dict[str, Any]) -> Dict[str, Any]:
         """Handle initialize method request"""
         return self.initialize(request.get("id"))
@@ -541,21 +1037,25 @@ class ComputerUseServer:
         return {
             "jsonrpc": "2.0",
             "id": request_id,
-            "result": {
-                "protocolVersion": "2024-11-05",
-                "capabilities": {
-                    "tools": {},
-                    "resources": {},
-                    "experimental": {
-                        "platform_detection": True,
-                        "windows_server_support": True,
-                        "vcxsrv_integration": True
-                    }
-                },
-                "serverInfo": {
-                    "name": "computer-use-mcp",
-                    "version": "1.0.0"
+            "result": self._initialize_result
+        }
+    
+    def _build_initialize_result(self) -> Dict[str, Any]:
+        """Build the (static) initialize result"""
+        return {
+            "protocolVersion": "2024-11-05",
+            "capabilities": {
+                "tools": {},
+                "resources": {},
+                "experimental": {
+                    "platform_detection": True,
+                    "windows_server_support": True,
+                    "vcxsrv_integration": True
                 }
+            },
+            "serverInfo": {
+                "name": "computer-use-mcp",
+                "version": "1.0.0"
             }
         }
     
@@ -564,52 +1064,15 @@ class ComputerUseServer:
         return {
             "jsonrpc": "2.0",
             "id": request_id,
-            "result": {
-                "tools": self.tools
-            }
+            "result": self._tools_result
         }
     
     def list_resources(self, request_id: Any) -> Dict[str, Any]:
         """List available resources"""
-        resources = [
-            {
-                "uri": "platform://capabilities",
-                "name": "Platform Capabilities",
-                "description": "Current platform capabilities and limitations",
-                "mimeType": "application/json"
-            },
-            {
-                "uri": "guide://vcxsrv-install",
-                "name": "VcXsrv Installation Guide", 
-                "description": "Step-by-step VcXsrv installation guide",
-                "mimeType": "text/markdown"
-            },
-            {
-                "uri": "guide://windows-server-setup",
-                "name": "Windows Server Setup Guide",
-                "description": "Windows Server automation setup guide",
-                "mimeType": "text/markdown"
-            },
-            {
-                "uri": "troubleshooting://display-issues",
-                "name": "Display Issues Troubleshooting",
-                "description": "Common display and screenshot issues",
-                "mimeType": "text/markdown"
-            },
-            {
-                "uri": "config://platform-defaults",
-                "name": "Platform Default Configuration",
-                "description": "Default configuration for current platform",
-                "mimeType": "application/json"
-            }
-        ]
-        
         return {
             "jsonrpc": "2.0",
             "id": request_id,
-            "result": {
-                "resources": resources
-            }
+            "result": self._resources_result
         }
     
     def read_resource(self, params: Dict[str, Any], request_id: Any) -> Dict[str, Any]:
@@ -618,17 +1081,16 @@ class ComputerUseServer:
         if not uri:
             return self.error_response(request_id, "Missing resource URI")
         
+        # Guides are static and their JSON is already encoded
+        guide = self._guide_results.get(uri) if isinstance(uri, str) else None
+        if guide is not None:
+            return {"jsonrpc": "2.0", "id": request_id, "result": guide}
+        
         try:
             if uri == "platform://capabilities":
-                content = self._get_platform_capabilities()
-            elif uri == "guide://vcxsrv-install":
-                content = self._get_vcxsrv_install_guide()
-            elif uri == "guide://windows-server-setup":
-                content = self._get_windows_server_setup_guide()
-            elif uri == "troubleshooting://display-issues":
-                content = self._get_display_troubleshooting()
+                content = self._cached_resource(uri, self._get_platform_capabilities)
             elif uri == "config://platform-defaults":
-                content = self._get_platform_defaults()
+                content = self._cached_resource(uri, self._get_platform_defaults)
             else:
                 return self.error_response(request_id, f"Unknown resource URI: {uri}")
             
@@ -647,6 +1109,23 @@ class ComputerUseServer:
         except Exception as e:
             return self.error_response(request_id, f"Failed to read resource: {e}")
     
+    def invalidate_platform_cache(self) -> None:
+        """Forget memoized platform probes and the resources rendered from them"""
+        from .platform_utils import invalidate_platform_cache
+        invalidate_platform_cache()
+        self._resource_cache.clear()
+    
+    def _cached_resource(self, uri: str, builder) -> str:
+        """Return a platform-dependent resource, rebuilt after RESOURCE_CACHE_TTL"""
+        now = time.monotonic()
+        cached = self._resource_cache.get(uri)
+        if cached is not None and now - cached[0] < RESOURCE_CACHE_TTL:
+            return cached[1]
+        
+        content = builder()
+        self._resource_cache[uri] = (now, content)
+        return content
+    
     def _get_platform_capabilities(self) -> str:
         """Get platform capabilities resource"""
         try:
@@ -673,180 +1152,15 @@ class ComputerUseServer:
     
     def _get_vcxsrv_install_guide(self) -> str:
         """Get VcXsrv installation guide resource"""
-        guide = """# VcXsrv Installation Guide
-
-## Overview
-VcXsrv is an X11 server for Windows that enables running Linux GUI applications.
-
-## Installation Steps
-
-1. **Download VcXsrv**
-   - Visit: https://sourceforge.net/projects/vcxsrv/
-   - Download the latest installer
-
-2. **Run Installer**
-   - Run as Administrator
-   - Follow installation wizard
-   - Use default settings
-
-3. **Launch XLaunch**
-   - Start XLaunch from Start Menu
-   - Configure display settings:
-     - Multiple windows mode (recommended)
-     - Display number: 0
-     - Enable clipboard sharing
-     - Disable access control (-ac)
-
-4. **Windows Firewall**
-   - Allow VcXsrv through Windows Firewall when prompted
-   - Both Private and Public networks
-
-## WSL2 Setup
-
-1. **Get Windows Host IP**
-   ```bash
-   export DISPLAY=$(cat /etc/resolv.conf | grep nameserver | awk '{print $2}'):0.0
-   ```
-
-2. **Test Connection**
-   ```bash
-   xeyes  # Should show eyes that follow mouse
-   ```
-
-## Troubleshooting
-
-- **Connection refused**: Check Windows Firewall
-- **No display**: Verify DISPLAY variable
-- **Black screen**: Try different display modes
-"""
-        return guide
+        return VCXSRV_INSTALL_GUIDE
     
     def _get_windows_server_setup_guide(self) -> str:
         """Get Windows Server setup guide resource"""
-        guide = """# Windows Server Automation Setup
-
-## Server Editions Supported
-
-- **Windows Server 2022** ✅ Full support
-- **Windows Server 2019** ✅ Full support  
-- **Windows Server 2016** ✅ Full support
-- **Windows Server Core** ⚠️ Limited GUI (use VcXsrv)
-
-## Setup by Environment
-
-### Windows Server with GUI
-- **Screenshot**: Native Windows GDI
-- **Input**: Native SendInput API
-- **Setup**: No additional setup required
-
-### Windows Server Core
-- **Screenshot**: Not available (no GUI)
-- **Alternatives**:
-  1. Install VcXsrv for X11 GUI
-  2. Use PowerShell automation
-  3. Use Windows Admin Center
-
-### RDP Sessions
-- **Screenshot**: RDP-aware capture
-- **Limitations**: Captures RDP window only
-- **Best Practice**: Use native tools on RDP client
-
-## PowerShell Automation (Server Core)
-
-```powershell
-# Service management
-Get-Service | Where-Object {$_.Status -eq "Running"}
-Restart-Service -Name "ServiceName"
-
-# File operations
-Get-ChildItem -Path C:\\ -Recurse -Filter "*.log"
-Copy-Item -Path "source" -Destination "dest" -Recurse
-
-# Network configuration
-Get-NetAdapter | Select-Object Name, Status, LinkSpeed
-```
-
-## VcXsrv on Server Core
-
-1. **Install VcXsrv on Windows client machine**
-2. **Configure remote access**
-3. **Set DISPLAY variable**
-4. **Test with simple X11 applications**
-"""
-        return guide
+        return WINDOWS_SERVER_SETUP_GUIDE
     
     def _get_display_troubleshooting(self) -> str:
         """Get display troubleshooting resource"""
-        guide = """# Display & Screenshot Troubleshooting
-
-## Common Issues
-
-### Black/Empty Screenshots
-
-**WSL2 Environment:**
-- **Cause**: X11 captures virtual display buffer
-- **Solution**: Use PowerShell bridge for Windows desktop capture
-
-**Server Core:**
-- **Cause**: No GUI available
-- **Solution**: Install VcXsrv or use PowerShell automation
-
-### Permission Errors
-
-**Linux:**
-- **Cause**: No access to X11 display
-- **Solution**: `xhost +local:` or proper DISPLAY variable
-
-**Windows:**
-- **Cause**: Insufficient privileges
-- **Solution**: Run as Administrator
-
-### Performance Issues
-
-**Large Screenshots:**
-- **Solution**: Use region capture instead of full screen
-- **Example**: `screenshot(region={'x': 0, 'y': 0, 'width': 800, 'height': 600})`
-
-**Slow Capture:**
-- **Solution**: Check system resources and display drivers
-
-### Network Issues (Remote)
-
-**RDP Sessions:**
-- **Issue**: Multi-monitor confusion
-- **Solution**: Use single monitor RDP or specify monitor
-
-**VcXsrv Remote:**
-- **Issue**: Firewall blocking X11
-- **Solution**: Configure Windows Firewall rules
-
-## Environment-Specific Solutions
-
-| Environment | Issue | Solution |
-|-------------|-------|----------|
-| WSL2 | Black screenshots | Use `wsl2_powershell` method |
-| Server Core | No screenshots | Install VcXsrv or use PowerShell |
-| RDP | Partial capture | Use RDP-aware methods |
-| VcXsrv | Connection refused | Check firewall and DISPLAY |
-
-## Diagnostic Commands
-
-```bash
-# Test X11 connectivity
-xset q
-
-# Check display variable
-echo $DISPLAY
-
-# Test screenshot tools
-scrot test.png
-import -window root test.png
-
-# Windows PowerShell test
-powershell -Command "Add-Type -AssemblyName System.Windows.Forms; [System.Windows.Forms.Screen]::PrimaryScreen"
-```
-"""
-        return guide
+        return DISPLAY_TROUBLESHOOTING_GUIDE
     
     def _get_platform_defaults(self) -> str:
         """Get platform default configuration resource"""
@@ -906,82 +1220,27 @@ powershell -Command "Add-Type -AssemblyName System.Windows.Forms; [System.Window
         
         arguments = params.get("arguments", {})
         
-        # Safety check first
-        try:
-            action_desc = f"{tool_name} {arguments}"
-            self.safety.validate_action(action_desc)
-        except Exception as e:
-            if "BLOCKED" in str(e):
-                return self.error_response(request_id, str(e))
+        # Malformed arguments are rejected before the safety pipeline
+        problem = self._argument_error(tool_name, arguments)
+        if problem:
+            return self.error_response(request_id, problem, code=-32602)
         
-        # Add ultrathink enhancement
-        log(f"Ultrathink analyzing: {tool_name} with {arguments}")
+        # Read-only info tools have nothing for the safety check to block
+        if not (isinstance(tool_name, str) and tool_name in FAST_PATH_TOOLS):
+            # Safety check first
+            blocked = self._check_safety(tool_name, arguments)
+            if blocked:
+                return self.error_response(request_id, blocked)
+            
+            # Add ultrathink enhancement
+            log(f"Ultrathink analyzing: {tool_name} with {arguments}")
         
         # Execute tool
         try:
-            if tool_name == "screenshot":
-                result = self.handle_screenshot(arguments)
-            elif tool_name == "click":
-                result = self.handle_click(arguments)
-            elif tool_name == "type":
-                result = self.handle_type(arguments)
-            elif tool_name == "key":
-                result = self.handle_key(arguments)
-            elif tool_name == "scroll":
-                result = self.handle_scroll(arguments)
-            elif tool_name == "drag":
-                result = self.handle_drag(arguments)
-            elif tool_name == "wait":
-                result = self.handle_wait(arguments)
-            elif tool_name == "automate":
-                result = self.handle_automate(arguments)
-            elif tool_name == "install_xserver":
-                result = self.handle_install_xserver(arguments)
-            elif tool_name == "start_xserver":
-                result = self.handle_start_xserver(arguments)
-            elif tool_name == "stop_xserver":
-                result = self.handle_stop_xserver(arguments)
-            elif tool_name == "setup_wsl_xforwarding":
-                result = self.handle_setup_wsl_xforwarding(arguments)
-            elif tool_name == "xserver_status":
-                result = self.handle_xserver_status(arguments)
-            elif tool_name == "test_display":
-                result = self.handle_test_display(arguments)
-            # Windows Server tools
-            elif tool_name == "detect_windows_server":
-                result = self.handle_detect_windows_server(arguments)
-            elif tool_name == "get_server_info":
-                result = self.handle_get_server_info(arguments)
-            elif tool_name == "check_server_core":
-                result = self.handle_check_server_core(arguments)
-            elif tool_name == "check_rdp_session":
-                result = self.handle_check_rdp_session(arguments)
-            elif tool_name == "get_server_capabilities":
-                result = self.handle_get_server_capabilities(arguments)
-            elif tool_name == "suggest_alternatives":
-                result = self.handle_suggest_alternatives(arguments)
-            # VcXsrv tools  
-            elif tool_name == "detect_vcxsrv":
-                result = self.handle_detect_vcxsrv(arguments)
-            elif tool_name == "start_vcxsrv":
-                result = self.handle_start_vcxsrv(arguments)
-            elif tool_name == "get_vcxsrv_status":
-                result = self.handle_get_vcxsrv_status(arguments)
-            elif tool_name == "test_x11_display":
-                result = self.handle_test_x11_display(arguments)
-            elif tool_name == "get_vcxsrv_capabilities":
-                result = self.handle_get_vcxsrv_capabilities(arguments)
-            elif tool_name == "install_vcxsrv_guide":
-                result = self.handle_install_vcxsrv_guide(arguments)
-            # Platform detection tools
-            elif tool_name == "get_platform_info":
-                result = self.handle_get_platform_info(arguments)
-            elif tool_name == "get_recommended_methods":
-                result = self.handle_get_recommended_methods(arguments)
-            elif tool_name == "check_display_available":
-                result = self.handle_check_display_available(arguments)
+            if tool_name == "batch_execute":
+                result = self.handle_batch_execute(arguments)
             else:
-                return self.error_response(request_id, f"Unknown tool: {tool_name}")
+                result = self._execute_tool(tool_name, arguments)
             
             # Wrap result in content array for MCP protocol
             return {
@@ -991,15 +1250,129 @@ powershell -Command "Add-Type -AssemblyName System.Windows.Forms; [System.Window
                     "content": [
                         {
                             "type": "text",
-                            "text": json.dumps(result)
+                            "text": _dumps(result)
                         }
                     ]
                 }
             }
+        except (UnknownToolError, SafetyBlocked) as e:
+            return self.error_response(request_id, str(e))
         except Exception as e:
             log(f"Tool execution failed: {e}")
             return self.error_response(request_id, str(e))
     
+    def _check_safety(self, tool_name: str, arguments: Dict[str, Any]) -> Optional[str]:
+        """Return the block message if the safety checker rejects this call"""
+        try:
+            self.safety.validate_action(tool_name, arguments)
+        except SafetyBlocked as e:
+            return str(e)
+        return None
+    
+    def _argument_error(self, tool_name: Any, arguments: Any) -> Optional[str]:
+        """Check arguments against the tool's inputSchema, returning the problem or None"""
+        if not isinstance(arguments, dict):
+            return "Arguments must be an object"
+        if not isinstance(tool_name, str):
+            return None
+        
+        validator = self._argument_validators.get(tool_name)
+        if validator is not None:
+            error = best_match(validator.iter_errors(arguments))
+            if error is None:
+                return None
+            location = ".".join(str(part) for part in error.absolute_path)
+            return f"Invalid arguments for {tool_name}: " + (f"{location}: {error.message}" if location else error.message)
+        
+        # An explicit null for a required argument is always invalid
+        required = self._required_arguments.get(tool_name)
+        if required:
+            nulls = [name for name in required if name in arguments and arguments[name] is None]
+            if nulls:
+                return f"Required arguments for {tool_name} cannot be null: {', '.join(nulls)}"
+        return None
+    
+    def _execute_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a single tool handler, raising UnknownToolError for unknown names"""
+        handler_name = TOOL_HANDLERS.get(tool_name) if isinstance(tool_name, str) else None
+        if handler_name is None:
+            raise UnknownToolError(f"Unknown tool: {tool_name}")
+        
+        return getattr(self, handler_name)(arguments)
+    
+    def handle_batch_execute(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Handle batch_execute tool - run several tool calls in one request"""
+        operations = args.get("operations")
+        if not isinstance(operations, list):
+            raise ValueError("operations must be an array")
+        
+        try:
+            max_concurrent = max(1, int(args.get("maxConcurrent", 1)))
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid maxConcurrent: {args.get('maxConcurrent')}")
+        stop_on_error = bool(args.get("stopOnError", False))
+        
+        stopped = threading.Event()
+        
+        def run_operation(operation: Any) -> Dict[str, Any]:
+            if not isinstance(operation, dict) or not operation.get("name"):
+                return {"success": False, "error": "Operation must be an object with a name"}
+            
+            name = operation["name"]
+            arguments = operation.get("arguments") or {}
+            if stopped.is_set():
+                return {"name": name, "success": False, "error": "Skipped after earlier failure"}
+            if name == "batch_execute":
+                return {"name": name, "success": False, "error": "batch_execute cannot be nested"}
+            
+            try:
+                problem = self._argument_error(name, arguments)
+                if problem:
+                    raise ValueError(problem)
+                
+                safety_error = self._check_safety(name, arguments)
+                if safety_error:
+                    raise Exception(safety_error)
+                result = self._execute_tool(name, arguments)
+                return {"name": name, "success": True, "result": result}
+            except Exception as e:
+                if stop_on_error:
+                    stopped.set()
+                return {"name": name, "success": False, "error": str(e)}
+        
+        def is_concurrent_safe(operation: Any) -> bool:
+            name = operation.get("name") if isinstance(operation, dict) else None
+            if not isinstance(name, str) or name not in CONCURRENT_SAFE_TOOLS:
+                return False
+            # A screenshot with save_path creates directories and writes a file
+            arguments = operation.get("arguments")
+            return not (name == "screenshot" and isinstance(arguments, dict) and arguments.get("save_path"))
+        
+        if max_concurrent == 1 or len(operations) <= 1:
+            results = [run_operation(operation) for operation in operations]
+        else:
+            results = []
+            with ThreadPoolExecutor(max_workers=min(max_concurrent, len(operations))) as executor:
+                index = 0
+                while index < len(operations):
+                    if not is_concurrent_safe(operations[index]):
+                        # Barrier: earlier operations have finished, later ones wait
+                        results.append(run_operation(operations[index]))
+                        index += 1
+                        continue
+                    # Consecutive read-only operations run together
+                    end = index
+                    while end < len(operations) and is_concurrent_safe(operations[end]):
+                        end += 1
+                    results.extend(executor.map(run_operation, operations[index:end]))
+                    index = end
+        
+        return {
+            "results": results,
+            "succeeded": sum(1 for r in results if r["success"]),
+            "failed": sum(1 for r in results if not r["success"])
+        }
+    
     def handle_screenshot(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Handle screenshot tool - MCP Enhanced with method selection"""
         # Extract parameters
@@ -1007,26 +1380,47 @@ powershell -Command "Add-Type -AssemblyName System.Windows.Forms; [System.Window
         method = args.get("method", "recommended")
         save_path = args.get("save_path", "")
         query = args.get("query", analyze_prompt)
+        if save_path:
+            save_path = self._prepare_save_path(save_path)
         
-        # MCP Enhancement: Use specific screenshot method if requested
-        if method != "recommended":
+        if method == "recommended":
+            # Common case: no handler lookup or fallback bookkeeping
+            screenshot_result = self.computer.screenshot(analyze=query)
+        else:
+            # MCP Enhancement: Use specific screenshot method if requested
             try:
                 from .screenshot import ScreenshotFactory
-                # Create screenshot handler with specific method
-                screenshot_handler = ScreenshotFactory.create(force=method)
-                screenshot_result = screenshot_handler.capture(save_path=save_path)
+                # Handlers are reused per method; setup probes the display
+                screenshot_handler = ScreenshotFactory.create(force=method, cached=True)
+                screenshot_result = screenshot_handler.capture()
             except Exception as e:
-                # Fallback to default method if specific method fails
+                # Fallback to default method if specific method fails; only
+                # the capture is retried, save_path write errors surface below
                 screenshot_result = self.computer.screenshot(analyze=query)
-        else:
-            # Use recommended method (current behavior)
-            screenshot_result = self.computer.screenshot(analyze=query)
         
-        # Extract the actual image data
+        # Extract the actual image data; the result dict is not kept past
+        # this point so the (multi-MB) buffer has a single owner
+        capture_error = None
         if isinstance(screenshot_result, dict):
             screenshot_data = screenshot_result.get('data', b'')
+            status = screenshot_result.get('status', 'success')
+            if screenshot_result.get('success') is False:
+                capture_error = screenshot_result.get('error', 'Screenshot failed')
         else:
             screenshot_data = screenshot_result
+            status = 'success'
+        del screenshot_result
+        
+        if save_path:
+            # Checked before the file is opened, which would truncate it
+            if capture_error is not None:
+                return {"error": f"{capture_error}; nothing saved to {save_path}"}
+            if not isinstance(screenshot_data, bytes) or not screenshot_data:
+                return {"error": f"Screenshot returned no image bytes; nothing saved to {save_path}"}
+            # Saved captures go straight to disk, never through base64/JSON
+            from .screenshot.base import write_screenshot
+            size = write_screenshot(save_path, screenshot_data)
+            return self._saved_screenshot_result(save_path, size, screenshot_data, analyze_prompt)
         
         # Analyze with visual analyzer
         analysis = self.visual.analyze_visual_context(screenshot_data)
@@ -1037,12 +1431,32 @@ powershell -Command "Add-Type -AssemblyName System.Windows.Forms; [System.Window
         else:
             # In test mode, data might be a string
             screenshot_b64 = str(screenshot_data)
+        del screenshot_data
         
         return {
             "screenshot": screenshot_b64,
             "analysis": analysis,
             "query": analyze_prompt,
-            "status": screenshot_result.get('status', 'success') if isinstance(screenshot_result, dict) else 'success'
+            "status": status
+        }
+    
+    def _prepare_save_path(self, save_path: str) -> str:
+        """Expand a screenshot save_path and create its directory once per session"""
+        path = os.path.abspath(os.path.expanduser(save_path))
+        directory = os.path.dirname(path)
+        if directory not in self._screenshot_dirs:
+            Path(directory).mkdir(parents=True, exist_ok=True)
+            self._screenshot_dirs.add(directory)
+        return path
+    
+    def _saved_screenshot_result(self, path: str, size: int, data: bytes, query: str) -> Dict[str, Any]:
+        """Result for a screenshot written to save_path instead of returned inline"""
+        return {
+            "path": path,
+            "size": size,
+            "analysis": self.visual.analyze_visual_context(data),
+            "query": query,
+            "status": "success"
         }
     
     def handle_click(self, args: Dict[str, Any]) -> Dict[str, Any]:
@@ -1061,8 +1475,8 @@ powershell -Command "Add-Type -AssemblyName System.Windows.Forms; [System.Window
             raise ValueError("Missing required coordinates x and y")
         
         try:
-            x_int = int(x)
-            y_int = int(y)
+            x_int = _to_int(x)
+            y_int = _to_int(y)
         except (TypeError, ValueError):
             raise ValueError(f"Invalid coordinates: x={x}, y={y}")
         
@@ -1076,11 +1490,14 @@ powershell -Command "Add-Type -AssemblyName System.Windows.Forms; [System.Window
         if text is None:
             raise ValueError("Text cannot be None")
         
+        # Convert once; pasted text can be large
+        text = text if isinstance(text, str) else str(text)
+        
         # Enhanced safety check for all security threats
-        if not self.safety.check_text_safety(str(text)):
-            raise Exception(f"BLOCKED: {self.safety.last_error}")
+        if not self.safety.check_text_safety(text):
+            raise SafetyBlocked(self.safety.last_error)
         
-        return self.computer.type_text(str(text))
+        return self.computer.type_text(text)
     
     def handle_key(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Handle key press tool"""
@@ -1088,7 +1505,7 @@ powershell -Command "Add-Type -AssemblyName System.Windows.Forms; [System.Window
         
         # Enhanced safety check for key presses
         if not self.safety.check_text_safety(str(key)):
-            raise Exception(f"BLOCKED: {self.safety.last_error}")
+            raise SafetyBlocked(self.safety.last_error)
         
         return self.computer.key_press(key)
     
@@ -1098,12 +1515,12 @@ powershell -Command "Add-Type -AssemblyName System.Windows.Forms; [System.Window
         amount = args.get("amount", 3)
         
         # Validate direction
-        if direction not in ["up", "down"]:
+        if not isinstance(direction, str) or direction not in SCROLL_DIRECTIONS:
             raise ValueError(f"Invalid scroll direction: {direction}")
         
         # Validate amount
         try:
-            amount_int = int(amount)
+            amount_int = _to_int(amount)
             if amount_int < 0:
                 raise ValueError(f"Scroll amount must be positive: {amount}")
         except (TypeError, ValueError):
@@ -1113,24 +1530,19 @@ powershell -Command "Add-Type -AssemblyName System.Windows.Forms; [System.Window
     
     def handle_drag(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Handle drag tool"""
-        start_x = args.get("start_x")
-        start_y = args.get("start_y")
-        end_x = args.get("end_x")
-        end_y = args.get("end_y")
+        coordinates = [args.get(name) for name in DRAG_COORDINATES]
         
         # Validate all coordinates are present
-        if start_x is None or start_y is None or end_x is None or end_y is None:
-            raise ValueError("All drag coordinates must be provided")
+        missing = [name for name, value in zip(DRAG_COORDINATES, coordinates) if value is None]
+        if missing:
+            raise ValueError(f"All drag coordinates must be provided, missing: {', '.join(missing)}")
         
         try:
-            start_x_int = int(start_x)
-            start_y_int = int(start_y)
-            end_x_int = int(end_x)
-            end_y_int = int(end_y)
+            start_x, start_y, end_x, end_y = [_to_int(value) for value in coordinates]
         except (TypeError, ValueError):
             raise ValueError(f"Invalid drag coordinates")
         
-        return self.computer.drag(start_x_int, start_y_int, end_x_int, end_y_int)
+        return self.computer.drag(start_x, start_y, end_x, end_y)
     
     def handle_wait(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Handle wait tool"""
@@ -1150,7 +1562,7 @@ powershell -Command "Add-Type -AssemblyName System.Windows.Forms; [System.Window
         
         # Enhanced safety check for automation goals
         if not self.safety.check_text_safety(str(task)):
-            raise Exception(f"BLOCKED: {self.safety.last_error}")
+            raise SafetyBlocked(self.safety.last_error)
         
         # Plan with ultrathink
         plan = self.ultrathink.plan_actions(task)
@@ -1289,11 +1701,11 @@ powershell -Command "Add-Type -AssemblyName System.Windows.Forms; [System.Window
                 "alternatives": [],
                 "method_details": {
                     "screenshot": {
-                        method: {"available": True, "platform_specific": method in ["windows_native", "macos_screencapture"]}
+                        method: {"available": True, "platform_specific": method in PLATFORM_SPECIFIC_SCREENSHOT_METHODS}
                         for method in all_screenshot_methods
                     },
                     "input": {
-                        method: {"available": True, "platform_specific": method in ["windows_native"]}  
+                        method: {"available": True, "platform_specific": method in PLATFORM_SPECIFIC_INPUT_METHODS}
                         for method in all_input_methods
                     }
                 }
@@ -1393,6 +1805,8 @@ powershell -Command "Add-Type -AssemblyName System.Windows.Forms; [System.Window
             from .vcxsrv_detector import VcXsrvDetector
             detector = VcXsrvDetector()
             result = detector.start_vcxsrv(display=display, width=width, height=height)
+            # VcXsrv state is part of the memoized platform probes
+            self.invalidate_platform_cache()
             return result
         except Exception as e:
             return {"error": f"VcXsrv start failed: {e}"}
@@ -1559,7 +1973,7 @@ powershell -Command "Add-Type -AssemblyName System.Windows.Forms; [System.Window
     def handle_check_display_available(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Handle display availability check"""
         try:
-            from .platform_utils import get_platform_info
+            from .platform_utils import get_platform_info, get_vcxsrv_status
             
             platform_info = get_platform_info()
             
@@ -1573,7 +1987,8 @@ powershell -Command "Add-Type -AssemblyName System.Windows.Forms; [System.Window
             # Add method-specific details
             if platform_info.get('environment') == 'windows_server_core':
                 result["details"]["server_core"] = True
-                result["details"]["vcxsrv_available"] = platform_info.get('vcxsrv_display_available', False)
+                # Platform info is probed once; VcXsrv may have started since
+                result["details"]["vcxsrv_available"] = get_vcxsrv_status().get('xdisplay_available', False)
             
             elif platform_info.get('environment') == 'windows_rdp':
                 result["details"]["rdp_session"] = True
@@ -1587,56 +2002,92 @@ powershell -Command "Add-Type -AssemblyName System.Windows.Forms; [System.Window
         except Exception as e:
             return {"error": f"Display check failed: {e}"}
     
-    def error_response(self, request_id: Any, message: str) -> Dict[str, Any]:
+    def error_response(self, request_id: Any, message: str, code: int = -32603) -> Dict[str, Any]:
         """Create error response"""
         return {
             "jsonrpc": "2.0",
             "id": request_id,
             "error": {
-                "code": -32603,
+                "code": code,
                 "message": message
             }
         }
     
     def run(self):
         """Run MCP server (stdio mode)"""
+        try:
+            fd = sys.stdin.fileno()
+        except (AttributeError, OSError, ValueError):
+            fd = None
+        
+        try:
+            if fd is None:
+                self._run_lines()
+            else:
+                self._run_batched(fd)
+        finally:
+            from .screenshot import close_cached_handlers
+            close_cached_handlers()
+    
+    def _run_lines(self):
+        """Serve a stdin without a file descriptor by iterating its lines"""
+        for line in sys.stdin:
+            output = self._handle_line(line)
+            if output is not None:
+                _write_stdout(output)
+    
+    def _run_batched(self, fd: int):
+        """Serve stdin in bulk reads, writing each response as soon as it is ready
+        
+        Pipelined requests are read many lines per syscall, but a fast call
+        is never held back behind a slow one that arrived in the same read.
+        """
+        # Only each new chunk is searched for a newline, so a request line
+        # spanning many reads is accumulated in linear time
+        pending = bytearray()
         while True:
-            try:
-                # Read line from stdin
-                line = sys.stdin.readline()
-                if not line:
-                    break
-                
-                # Skip empty lines
-                line = line.strip()
-                if not line:
+            chunk = os.read(fd, STDIN_READ_SIZE)
+            if not chunk:
+                lines = [pending]
+            else:
+                newline = chunk.rfind(b"\n")
+                if newline < 0:
+                    pending += chunk
                     continue
-                
-                # Parse JSON request
-                request = json.loads(line)
-                
-                # Handle request
-                response = self.handle_request(request)
-                
-                # Send response
-                sys.stdout.write(json.dumps(response) + "\n")
-                sys.stdout.flush()
-                
-            except json.JSONDecodeError as e:
-                # Send error response for invalid JSON
-                error_response = {
-                    "jsonrpc": "2.0",
-                    "id": None,
-                    "error": {
-                        "code": -32700,
-                        "message": "Parse error"
-                    }
-                }
-                sys.stdout.write(json.dumps(error_response) + "\n")
-                sys.stdout.flush()
-            except Exception as e:
-                log(f"Server error: {e}")
-
+                pending += chunk[:newline]
+                lines = pending.split(b"\n")
+                pending = bytearray(chunk[newline + 1:])
+            
+            for line in lines:
+                output = self._handle_line(line)
+                if output is not None:
+                    _write_stdout(output)
+            
+            if not chunk:
+                break
+    
+    def _handle_line(self, line) -> Optional[str]:
+        """Handle one newline-delimited request, returning the output line"""
+        try:
+            # Skip empty lines
+            line = line.strip()
+            if not line:
+                return None
+            
+            # Parse JSON request
+            request = _loads(line)
+            
+            # Handle request
+            response = self.handle_request(request)
+            
+            return self._encode_response(response, _static_result_key(request)) + "\n"
+            
+        except json.JSONDecodeError as e:
+            # Send error response for invalid JSON
+            return _PARSE_ERROR_LINE
+        except Exception as e:
+            log(f"Server error: {e}")
+            return None
 
 def main():
     """Main entry point"""
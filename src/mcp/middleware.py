@@ -11,6 +11,8 @@ from dataclasses import dataclass
 from functools import wraps
 import json
 
+from .error_handling import RetryStrategy
+
 logger = logging.getLogger(__name__)
 
 
@@ -252,13 +254,19 @@ class MetricsMiddleware:
 
 
 class RetryMiddleware:
-    """Retry failed operations"""
+    """Retry failed operations
+    
+    Waits retry_delay between attempts, or backoff.get_delay(n) for the
+    n-th retry when a RetryStrategy such as ExponentialBackoff is given.
+    """
     
     def __init__(self, max_retries: int = 3, retry_delay: float = 1.0,
-                 retry_actions: List[str] = None):
+                 retry_actions: List[str] = None,
+                 backoff: Optional[RetryStrategy] = None):
         self.max_retries = max_retries
         self.retry_delay = retry_delay
         self.retry_actions = retry_actions or ['screenshot']
+        self.backoff = backoff
     
     def process_request(self, request: Request, next_handler: Callable) -> Response:
         """Retry on failure for configured actions"""
@@ -281,7 +289,10 @@ class RetryMiddleware:
             
             if attempt <= self.max_retries:
                 logger.warning(f"Retrying {request.action} (attempt {attempt}/{self.max_retries})")
-                time.sleep(self.retry_delay)
+                if self.backoff is not None:
+                    time.sleep(self.backoff.get_delay(attempt - 1))
+                else:
+                    time.sleep(self.retry_delay)
         
         # All retries failed
         response.metadata['retry_attempts'] = self.max_retries
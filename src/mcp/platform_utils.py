@@ -8,7 +8,8 @@ import os
 import platform
 import subprocess
 import shutil
-from typing import Dict, Any, Optional
+import time
+from typing import Dict, Any, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
@@ -203,8 +204,29 @@ class PlatformDetector:
 # Global instance for convenience
 _detector = PlatformDetector()
 
+# VcXsrv can be started or stopped outside the server, so its status is
+# only reused for as long as the screenshot backend reuses its own probe
+VCXSRV_STATUS_CACHE_TTL = 30.0
+
+# Keyed on the detector class so patched detectors (tests) never see stale results
+_VCXSRV_STATUS_CACHE: Dict[Any, Tuple[float, Dict[str, Any]]] = {}
+
+def _cached_vcxsrv_status(detector_cls) -> Dict[str, Any]:
+    entry = _VCXSRV_STATUS_CACHE.get(detector_cls)
+    if entry is not None and time.monotonic() - entry[0] < VCXSRV_STATUS_CACHE_TTL:
+        return entry[1]
+    status = detector_cls().detect_vcxsrv()
+    _VCXSRV_STATUS_CACHE[detector_cls] = (time.monotonic(), status)
+    return status
+
+def invalidate_platform_cache() -> None:
+    """Drop memoized platform probes so the next call re-detects"""
+    _VCXSRV_STATUS_CACHE.clear()
+    _detector._platform_cache = None
+
 def get_platform_info() -> Dict[str, Any]:
     """Get platform information"""
+    # detect_platform() memoizes its result on the detector
     return _detector.detect_platform()
 
 def is_wsl2() -> bool:
@@ -283,7 +305,7 @@ def get_vcxsrv_status() -> Dict[str, Any]:
     
     try:
         from .vcxsrv_detector import VcXsrvDetector
-        detector = VcXsrvDetector()
-        return detector.detect_vcxsrv()
+        # Callers annotate the result, so hand out a copy of the cached probe
+        return dict(_cached_vcxsrv_status(VcXsrvDetector))
     except Exception as e:
         return {'available': False, 'error': str(e)}
\ No newline at end of file
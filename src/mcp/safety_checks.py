@@ -5,12 +5,85 @@ Prevents dangerous actions and protects sensitive information
 """
 
 import re
+import functools
 import logging
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, Iterable, List, Optional, Pattern, Tuple
+
+from .error_handling import SafetyError
 
 logger = logging.getLogger(__name__)
 
 
+class SafetyBlocked(SafetyError):
+    """Raised when an action is rejected by the safety checks"""
+    
+    def __init__(self, reason: str, action: Optional[str] = None):
+        message = f"BLOCKED: {reason}: {action}" if action is not None else f"BLOCKED: {reason}"
+        super().__init__(message, blocked_action=action or "", reason=reason)
+
+# Path traversal / system path probes rejected by check_text_safety
+PATH_TRAVERSAL_PATTERNS = (
+    r'\.\./', r'\.\.\\',  # ../ and ..\
+    r'/etc/', r'\\etc\\',  # /etc/ paths
+    r'/proc/', r'/sys/',  # Linux system paths
+    r'/var/log/',  # Log paths
+    r'C:\\Windows\\System32',  # Windows system paths
+    r'C:\\Program Files',
+)
+
+
+@functools.lru_cache(maxsize=64)
+def _combined(patterns: Tuple[str, ...], flags: int) -> Optional[Pattern]:
+    """Compile a pattern list into one alternation so a check is a single search"""
+    if not patterns:
+        return None
+    return re.compile('|'.join(f'(?:{pattern})' for pattern in patterns), flags)
+
+
+def _search_any(patterns: Iterable[str], text: str, flags: int = 0) -> bool:
+    """True if any of the patterns matches somewhere in text"""
+    regex = _combined(tuple(patterns), flags)
+    return regex is not None and regex.search(text) is not None
+
+
+@functools.lru_cache(maxsize=8)
+def _blocked_command_patterns(commands: frozenset) -> Tuple[str, ...]:
+    """Literal, lowercased patterns for the blocked command substrings"""
+    return tuple(re.escape(command.lower()) for command in sorted(commands))
+
+
+# Bidi overrides, invisible marks and unusual separators rejected in typed text
+_DANGEROUS_UNICODE_RE = re.compile('[\u202e\u202d\u200e\u200f\ufeff\u00a0\u2028\u2029]')
+
+
+@functools.lru_cache(maxsize=8)
+def _privilege_patterns(commands: frozenset) -> Tuple[str, ...]:
+    """Whole-word patterns for privilege escalation commands"""
+    # Word boundaries avoid false positives like "su" in "suggest_alternatives"
+    return tuple(r'\b' + re.escape(command.lower()) + r'\b' for command in sorted(commands))
+
+
+# Arguments holding free text (typed text, prompts, queries) rather than
+# commands; log-injection patterns flag ordinary multi-line text there
+_FREE_TEXT_ARGUMENTS = frozenset({"text", "analyze", "query"})
+
+
+def _string_values(value: Any) -> Iterable[Tuple[str, bool]]:
+    """Yield (string, is_free_text) for every key and string nested in an argument structure"""
+    stack = [(value, False)]
+    while stack:
+        item, free_text = stack.pop()
+        if isinstance(item, str):
+            yield item, free_text
+        elif isinstance(item, dict):
+            for key, nested in item.items():
+                if isinstance(key, str):
+                    yield key, False
+                stack.append((nested, key in _FREE_TEXT_ARGUMENTS))
+        elif isinstance(item, (list, tuple)):
+            stack.extend((nested, free_text) for nested in item)
+
+
 class SafetyChecker:
     """Safety validation for computer use actions"""
     
@@ -48,7 +121,7 @@ class SafetyChecker:
             r'\|\s*(nc|netcat|bash|sh)',  # Piping to shells
             r'`[^`]*`',  # Backtick command substitution
             r'\$\([^)]+\)',  # Command substitution
-            r'\\n\s*(rm|del|format)',  # Newline injection with dangerous commands
+            r'(\r?\n|\\n)\s*(rm|del|format)\b\s+\S',  # Newline (real or escaped) injection with dangerous commands
         ]
         
         self.credential_patterns = [
@@ -139,46 +212,58 @@ class SafetyChecker:
             'mhtml:', 'x-javascript:', 'jar:', 'jnlp:',
         ]
     
-    def validate_action(self, action: str, params: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
+    def validate_action(self, action: str, params: Optional[Dict[str, Any]] = None) -> Tuple[bool, Optional[str]]:
         """
         Validate if an action is safe to perform
         Returns (is_safe, error_message)
+        
+        The action and each key and string value in params are checked
+        separately, so arguments are never stringified into one description.
         """
+        self._validate_action_text(action)
+        if params:
+            for value, free_text in _string_values(params):
+                self._validate_action_text(value, check_network=False, check_log_injection=not free_text)
+            
+            # Network patterns describe automation goals, not typed text or
+            # screenshot prompts, so only automate's task is held to them
+            task = params.get("task") if action == "automate" else None
+            if isinstance(task, str):
+                self._check_network_goal(task)
+        
+        # Default allow for unrecognized but not dangerous
+        return (True, None)
+    
+    def _validate_action_text(self, action: str, check_network: bool = True,
+                              check_log_injection: bool = True) -> None:
+        """Raise if a single action string matches a blocked pattern"""
         action_lower = action.lower()
         
         # Check against blocked commands
-        if any(blocked in action_lower for blocked in self.blocked_commands):
-            raise Exception(f"BLOCKED: Dangerous command detected: {action}")
+        if _search_any(_blocked_command_patterns(frozenset(self.blocked_commands)), action_lower):
+            raise SafetyBlocked("Dangerous command detected", action)
         
+        # Each pattern group is compiled once into a single alternation
         # Check for privilege escalation commands (whole word matches only)
-        for priv_cmd in self.privilege_escalation_commands:
-            # Use word boundaries to avoid false positives like "su" in "suggest_alternatives"
-            pattern = r'\b' + re.escape(priv_cmd.lower()) + r'\b'
-            if re.search(pattern, action_lower):
-                raise Exception(f"BLOCKED: Privilege escalation attempt detected: {action}")
+        if _search_any(_privilege_patterns(frozenset(self.privilege_escalation_commands)), action_lower):
+            raise SafetyBlocked("Privilege escalation attempt detected", action)
         
         # Check for network operations in automation goals
-        for pattern in self.network_operation_patterns:
-            if re.search(pattern, action, re.IGNORECASE):
-                raise Exception(f"BLOCKED: Network operation detected: {action}")
+        if check_network:
+            self._check_network_goal(action)
         
-        # Check for log injection attempts
-        for pattern in self.log_injection_patterns:
-            if re.search(pattern, action, re.IGNORECASE | re.MULTILINE):
-                raise Exception(f"BLOCKED: Log injection attempt detected: {action}")
+        # Check for log injection attempts (free-text arguments are exempt)
+        if check_log_injection and _search_any(self.log_injection_patterns, action, re.IGNORECASE | re.MULTILINE):
+            raise SafetyBlocked("Log injection attempt detected", action)
         
         # Check against dangerous patterns
-        for pattern in self.dangerous_patterns:
-            if re.search(pattern, action, re.IGNORECASE):
-                raise Exception(f"BLOCKED: Dangerous pattern detected: {action}")
-        
-        # Safe actions are allowed
-        safe_keywords = ['screenshot', 'click', 'type', 'scroll', 'move', 'wait']
-        if any(keyword in action_lower for keyword in safe_keywords):
-            return (True, None)
-        
-        # Default allow for unrecognized but not dangerous
-        return (True, None)
+        if _search_any(self.dangerous_patterns, action, re.IGNORECASE):
+            raise SafetyBlocked("Dangerous pattern detected", action)
+    
+    def _check_network_goal(self, goal: str) -> None:
+        """Raise if an automation goal asks for a network operation"""
+        if _search_any(self.network_operation_patterns, goal, re.IGNORECASE):
+            raise SafetyBlocked("Network operation detected", goal)
     
     def check_screenshot(self, image: Any) -> Dict[str, Any]:
         """Check screenshot for sensitive information"""
@@ -188,12 +273,11 @@ class SafetyChecker:
             text = image.text.lower()
             
             # Check for credentials
-            for pattern in self.credential_patterns:
-                if re.search(pattern, text, re.IGNORECASE):
-                    return {
-                        'safe': False,
-                        'reason': 'Credential detected in screenshot'
-                    }
+            if _search_any(self.credential_patterns, text, re.IGNORECASE):
+                return {
+                    'safe': False,
+                    'reason': 'Credential detected in screenshot'
+                }
         
         return {'safe': True, 'reason': 'No sensitive data detected'}
     
@@ -202,22 +286,20 @@ class SafetyChecker:
         content_lower = content.lower()
         
         # Check for credentials
-        for pattern in self.credential_patterns:
-            if re.search(pattern, content, re.IGNORECASE):
-                return {
-                    'safe': False,
-                    'reason': 'Credential detected',
-                    'type': 'credential'
-                }
+        if _search_any(self.credential_patterns, content, re.IGNORECASE):
+            return {
+                'safe': False,
+                'reason': 'Credential detected',
+                'type': 'credential'
+            }
         
         # Check for sensitive data
-        for pattern in self.sensitive_patterns:
-            if re.search(pattern, content):
-                return {
-                    'safe': False,
-                    'reason': 'Sensitive data detected',
-                    'type': 'personal_info'
-                }
+        if _search_any(self.sensitive_patterns, content):
+            return {
+                'safe': False,
+                'reason': 'Sensitive data detected',
+                'type': 'personal_info'
+            }
         
         return {'safe': True}
     
@@ -287,22 +369,10 @@ class SafetyChecker:
         # Normalize Unicode to catch bypass attempts
         import unicodedata
         
-        # Check for dangerous Unicode characters first
-        dangerous_unicode = [
-            '\u202e',  # Right-to-left override
-            '\u202d',  # Left-to-right override
-            '\u200e',  # Left-to-right mark
-            '\u200f',  # Right-to-left mark
-            '\ufeff',  # Zero-width no-break space
-            '\u00a0',  # Non-breaking space
-            '\u2028',  # Line separator
-            '\u2029',  # Paragraph separator
-        ]
-        
-        for char in dangerous_unicode:
-            if char in text:
-                self.last_error = f"Dangerous Unicode character detected"
-                return False
+        # Check for dangerous Unicode characters first (one scan for all of them)
+        if _DANGEROUS_UNICODE_RE.search(text):
+            self.last_error = f"Dangerous Unicode character detected"
+            return False
         
         # Now normalize the text
         normalized_text = unicodedata.normalize('NFKC', text)
@@ -317,64 +387,49 @@ class SafetyChecker:
                 return False
         
         # Check dangerous patterns with case-insensitive matching
-        for pattern in self.dangerous_patterns:
-            if re.search(pattern, text, re.IGNORECASE):
-                self.last_error = f"Dangerous pattern detected"
-                return False
-            if re.search(pattern, normalized_text, re.IGNORECASE):
-                self.last_error = f"Dangerous pattern detected (Unicode bypass)"
-                return False
+        if _search_any(self.dangerous_patterns, text, re.IGNORECASE):
+            self.last_error = f"Dangerous pattern detected"
+            return False
+        if _search_any(self.dangerous_patterns, normalized_text, re.IGNORECASE):
+            self.last_error = f"Dangerous pattern detected (Unicode bypass)"
+            return False
         
         # Check blocked commands (case-insensitive)
         text_lower = text.lower()
         normalized_lower = normalized_text.lower()
-        for blocked in self.blocked_commands:
-            if blocked.lower() in text_lower or blocked.lower() in normalized_lower:
-                self.last_error = f"Blocked command detected"
-                return False
+        blocked_patterns = _blocked_command_patterns(frozenset(self.blocked_commands))
+        if _search_any(blocked_patterns, text_lower) or _search_any(blocked_patterns, normalized_lower):
+            self.last_error = f"Blocked command detected"
+            return False
         
         # Check privilege escalation commands (whole word matches only)
-        for priv_cmd in self.privilege_escalation_commands:
-            # Use word boundaries to avoid false positives like "su" in "suggest_alternatives"
-            pattern = r'\b' + re.escape(priv_cmd.lower()) + r'\b'
-            if re.search(pattern, text_lower) or re.search(pattern, normalized_lower):
-                self.last_error = f"Privilege escalation command detected"
-                return False
+        priv_patterns = _privilege_patterns(frozenset(self.privilege_escalation_commands))
+        if _search_any(priv_patterns, text_lower) or _search_any(priv_patterns, normalized_lower):
+            self.last_error = f"Privilege escalation command detected"
+            return False
         
         # Check for log injection attempts
-        for pattern in self.log_injection_patterns:
-            if re.search(pattern, text, re.IGNORECASE | re.MULTILINE):
-                self.last_error = f"Log injection attempt detected"
-                return False
-            if re.search(pattern, normalized_text, re.IGNORECASE | re.MULTILINE):
-                self.last_error = f"Log injection attempt detected (Unicode bypass)"
-                return False
+        if _search_any(self.log_injection_patterns, text, re.IGNORECASE | re.MULTILINE):
+            self.last_error = f"Log injection attempt detected"
+            return False
+        if _search_any(self.log_injection_patterns, normalized_text, re.IGNORECASE | re.MULTILINE):
+            self.last_error = f"Log injection attempt detected (Unicode bypass)"
+            return False
         
         # Check SQL injection patterns
-        for pattern in self.sql_injection_patterns:
-            if re.search(pattern, text, re.IGNORECASE):
-                self.last_error = f"SQL injection attempt detected"
-                return False
+        if _search_any(self.sql_injection_patterns, text, re.IGNORECASE):
+            self.last_error = f"SQL injection attempt detected"
+            return False
         
         # Check credentials
-        for pattern in self.credential_patterns:
-            if re.search(pattern, text, re.IGNORECASE):
-                self.last_error = f"Credential detected"
-                return False
+        if _search_any(self.credential_patterns, text, re.IGNORECASE):
+            self.last_error = f"Credential detected"
+            return False
         
         # Enhanced path traversal detection
-        path_traversal_patterns = [
-            r'\.\./', r'\.\.\\',  # ../ and ..\
-            r'/etc/', r'\\etc\\',  # /etc/ paths
-            r'/proc/', r'/sys/',  # Linux system paths
-            r'/var/log/',  # Log paths
-            r'C:\\Windows\\System32',  # Windows system paths
-            r'C:\\Program Files',
-        ]
-        for pattern in path_traversal_patterns:
-            if re.search(pattern, text, re.IGNORECASE):
-                self.last_error = f"Path traversal attempt"
-                return False
+        if _search_any(PATH_TRAVERSAL_PATTERNS, text, re.IGNORECASE):
+            self.last_error = f"Path traversal attempt"
+            return False
         
         # Check dangerous URL schemes
         text_lower_stripped = text_lower.strip()
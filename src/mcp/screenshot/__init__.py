@@ -4,29 +4,75 @@ Provides cross-platform screenshot functionality
 """
 
 from typing import Optional, Union, Dict, Any
+import importlib
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
-# Lazy imports to avoid loading unnecessary modules
-_screenshot_instance: Optional['ScreenshotBase'] = None
+# Handler instances keyed by backend, guarded by _screenshot_instance_lock
+_instances: Dict[Any, 'ScreenshotBase'] = {}
+_screenshot_instance_lock = threading.Lock()
+
+
+# Backend tables: (submodule, class name), imported lazily only when selected
+# to avoid loading unnecessary modules
+_METHOD_BACKENDS = {
+    'windows_native': ('windows', 'WindowsScreenshot'),
+    'windows_rdp_capture': ('windows_rdp', 'RDPScreenshot'),
+    'not_available': ('server_core', 'ServerCoreScreenshot'),
+    'vcxsrv_x11': ('vcxsrv', 'VcXsrvScreenshot'),
+    'wsl2_powershell': ('windows', 'WSL2Screenshot'),
+    'x11': ('x11', 'X11Screenshot'),
+}
+
+_FORCED_BACKENDS = {
+    'windows': ('windows', 'WindowsScreenshot'),
+    'windows_rdp': ('windows_rdp', 'RDPScreenshot'),
+    'server_core': ('server_core', 'ServerCoreScreenshot'),
+    'vcxsrv': ('vcxsrv', 'VcXsrvScreenshot'),
+    'wsl2': ('windows', 'WSL2Screenshot'),
+    'x11': ('x11', 'X11Screenshot'),
+}
+
+
+def _load_backend(module: str, class_name: str):
+    """Import a backend submodule on demand and return its class"""
+    return getattr(importlib.import_module(f'.{module}', __name__), class_name)
+
+
+def _instance_key(force: Optional[str], config: Optional[Dict[str, Any]]):
+    """Build a cache key for a backend/config pair, or None if unhashable"""
+    try:
+        key = (force, frozenset(config.items()) if config else None)
+        hash(key)
+    except TypeError:
+        return None
+    return key
 
 
 class ScreenshotFactory:
     """Factory for creating appropriate screenshot implementation"""
     
     @staticmethod
-    def create(force: Optional[str] = None, config: Optional[Dict[str, Any]] = None) -> 'ScreenshotBase':
+    def create(force: Optional[str] = None, config: Optional[Dict[str, Any]] = None,
+               cached: bool = False) -> 'ScreenshotBase':
         """
         Create appropriate screenshot implementation
         
         Args:
             force: Force specific implementation ('windows', 'x11', 'wsl2', etc.)
             config: Configuration options
+            cached: Reuse a previously created instance for the same force/config
             
         Returns:
             Screenshot implementation instance
         """
+        if cached:
+            key = _instance_key(force, config)
+            if key is not None:
+                return _get_or_create(key, lambda: ScreenshotFactory.create(force, config))
+        
         from ..platform_utils import get_platform_info, get_recommended_screenshot_method
         
         if force:
@@ -39,67 +85,30 @@ class ScreenshotFactory:
         logger.info(f"Auto-detected platform: {platform_info['platform']} "
                    f"({platform_info['environment']}), using method: {method}")
         
-        if method == 'windows_native':
-            from .windows import WindowsScreenshot
-            return WindowsScreenshot(config)
-        elif method == 'windows_rdp_capture':
-            from .windows_rdp import RDPScreenshot
-            return RDPScreenshot(config)
-        elif method == 'not_available':
-            from .server_core import ServerCoreScreenshot
-            return ServerCoreScreenshot(config)
-        elif method == 'vcxsrv_x11':
-            from .vcxsrv import VcXsrvScreenshot
-            return VcXsrvScreenshot(config)
-        elif method == 'wsl2_powershell':
-            from .windows import WSL2Screenshot
-            return WSL2Screenshot(config)
-        elif method == 'x11':
-            from .x11 import X11Screenshot
-            return X11Screenshot(config)
-        elif method == 'macos_screencapture':
-            from .macos import MacOSScreenshot
-            return MacOSScreenshot(config)
-        else:
+        backend = _METHOD_BACKENDS.get(method)
+        if backend is None:
             # Fallback
             return ScreenshotFactory._create_fallback(config)
+        return _load_backend(*backend)(config)
     
     @staticmethod
     def _create_forced(implementation: str, config: Optional[Dict[str, Any]] = None) -> 'ScreenshotBase':
-        """Create forced implementation"""
-        if implementation == 'windows':
-            from .windows import WindowsScreenshot
-            return WindowsScreenshot(config)
-        elif implementation == 'windows_rdp':
-            from .windows_rdp import RDPScreenshot
-            return RDPScreenshot(config)
-        elif implementation == 'server_core':
-            from .server_core import ServerCoreScreenshot
-            return ServerCoreScreenshot(config)
-        elif implementation == 'vcxsrv':
-            from .vcxsrv import VcXsrvScreenshot
-            return VcXsrvScreenshot(config)
-        elif implementation == 'wsl2':
-            from .windows import WSL2Screenshot
-            return WSL2Screenshot(config)
-        elif implementation == 'x11':
-            from .x11 import X11Screenshot
-            return X11Screenshot(config)
-        else:
+        """Create forced implementation
+        
+        Accepts the short backend names and the screenshot tool's method names.
+        """
+        backend = _FORCED_BACKENDS.get(implementation) or _METHOD_BACKENDS.get(implementation)
+        if backend is None:
             raise ValueError(f"Unknown implementation: {implementation}")
+        return _load_backend(*backend)(config)
     
     @staticmethod
     def _create_fallback(config: Optional[Dict[str, Any]] = None) -> 'ScreenshotBase':
         """Create fallback implementation"""
         # Try implementations in order
-        implementations = [
-            ('x11', lambda: __import__('mcp.screenshot.x11', fromlist=['X11Screenshot']).X11Screenshot),
-            ('windows', lambda: __import__('mcp.screenshot.windows', fromlist=['WindowsScreenshot']).WindowsScreenshot),
-        ]
-        
-        for name, loader in implementations:
+        for name in ('x11', 'windows'):
             try:
-                cls = loader()
+                cls = _load_backend(*_FORCED_BACKENDS[name])
                 instance = cls(config)
                 if instance.is_available():
                     logger.info(f"Using fallback implementation: {name}")
@@ -111,15 +120,40 @@ class ScreenshotFactory:
         raise RuntimeError("No screenshot implementation available")
 
 
+def _get_or_create(key, builder) -> 'ScreenshotBase':
+    """Return the cached instance for key, building it once under the lock"""
+    instance = _instances.get(key)
+    if instance is None:
+        with _screenshot_instance_lock:
+            instance = _instances.get(key)
+            if instance is None:
+                instance = builder()
+                _instances[key] = instance
+    return instance
+
+
 def get_screenshot_handler() -> 'ScreenshotBase':
     """Get cached screenshot handler instance"""
-    global _screenshot_instance
+    from ..platform_utils import get_recommended_screenshot_method
     
-    if _screenshot_instance is None:
-        _screenshot_instance = ScreenshotFactory.create()
+    return _get_or_create(get_recommended_screenshot_method(), ScreenshotFactory.create)
+
+
+def close_cached_handlers() -> None:
+    """Release the handles held by cached screenshot handlers and forget them"""
+    with _screenshot_instance_lock:
+        instances = list(_instances.values())
+        _instances.clear()
     
-    return _screenshot_instance
+    for instance in instances:
+        close = getattr(instance, 'close', None)
+        if close is None:
+            continue
+        try:
+            close()
+        except Exception as e:
+            logger.debug(f"Closing {type(instance).__name__} failed: {e}")
 
 
 # Public API
-__all__ = ['ScreenshotFactory', 'get_screenshot_handler']
\ No newline at end of file
+__all__ = ['ScreenshotFactory', 'get_screenshot_handler', 'close_cached_handlers']
\ No newline at end of file
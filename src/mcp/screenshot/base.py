@@ -5,9 +5,35 @@ Base classes for screenshot implementations
 from abc import ABC, abstractmethod
 from typing import Optional, Dict, Any, List, Tuple
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
+# O_BINARY stops the Windows CRT from translating newlines in the image;
+# os.open already makes the descriptor non-inheritable (O_CLOEXEC)
+_WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+
+
+def write_screenshot(path: str, data: bytes) -> int:
+    """
+    Write screenshot bytes to a file without intermediate copies
+    
+    Args:
+        path: Destination file path (created or truncated)
+        data: Image bytes
+        
+    Returns:
+        Number of bytes written
+    """
+    view = memoryview(data)
+    fd = os.open(path, _WRITE_FLAGS, 0o644)
+    try:
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+    return len(data)
+
 
 class ScreenshotBase(ABC):
     """Abstract base class for screenshot implementations"""
@@ -5,7 +5,7 @@ Provides alternative solutions for GUI-less server environments
 """
 
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from .base import ScreenshotBase, ScreenshotCaptureError
 
 logger = logging.getLogger(__name__)
@@ -39,6 +39,14 @@ class ServerCoreScreenshot(ScreenshotBase):
         
         raise ScreenshotCaptureError(error_msg)
     
+    def is_available(self) -> bool:
+        """Server Core has no display to capture"""
+        return False
+    
+    def get_monitors(self) -> List[Dict[str, Any]]:
+        """Server Core has no monitors"""
+        return []
+    
     def _get_alternatives(self) -> list:
         """Get alternative automation methods for Server Core"""
         return [
@@ -4,15 +4,46 @@ VcXsrv X11 screenshot implementation for Windows
 Enables X11 application screenshots via VcXsrv server
 """
 
+import copy
 import os
+import re
+import shutil
 import subprocess
 import tempfile
+import time
 import logging
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 from .base import ScreenshotBase, ScreenshotCaptureError
 
 logger = logging.getLogger(__name__)
 
+PNG_MAGIC = b'\x89PNG'
+
+SCREENSHOT_TOOLS = (
+    'import',           # ImageMagick
+    'scrot',            # SCReenshOT
+    'xwd',              # X Window Dump
+    'gnome-screenshot'
+)
+
+_XRANDR_RE = re.compile(
+    r'^(?P<name>\S+) connected (?P<primary>primary )?'
+    r'(?P<w>\d+)x(?P<h>\d+)\+(?P<x>\d+)\+(?P<y>\d+)'
+)
+
+# Probe results shared across instances, refreshed after PROBE_CACHE_TTL seconds
+PROBE_CACHE_TTL = 30.0
+_TOOL_CACHE: Dict[Tuple[str, str], Tuple[float, Dict[str, bool]]] = {}
+_VCXSRV_CACHE: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
+
+def _cache_get(cache: Dict, key):
+    """Return a cached probe result if it is still fresh"""
+    entry = cache.get(key)
+    if entry is not None and time.monotonic() - entry[0] < PROBE_CACHE_TTL:
+        return entry[1]
+    return None
+
 
 class VcXsrvScreenshot(ScreenshotBase):
     """Screenshot implementation using VcXsrv X11 server on Windows"""
@@ -20,16 +51,33 @@ class VcXsrvScreenshot(ScreenshotBase):
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         """Initialize VcXsrv screenshot handler"""
         super().__init__(config)
+        
         self.vcxsrv_info = self._detect_vcxsrv()
         self.display = self._get_display()
+        self._env = self._build_env()
         self.screenshot_tools = self._detect_screenshot_tools()
+        self._available: Optional[bool] = None
+    
+    def _build_env(self) -> Optional[Dict[str, str]]:
+        """Build the subprocess environment pointing at our display once"""
+        if not self.display:
+            return None
+        return {**os.environ, 'DISPLAY': self.display}
         
     def _detect_vcxsrv(self) -> Dict[str, Any]:
         """Detect VcXsrv installation and status"""
+        key = os.environ.get('PATH', '')
+        cached = _cache_get(_VCXSRV_CACHE, key)
+        if cached is not None:
+            # Instances get their own copy; the cached entry stays pristine
+            return copy.deepcopy(cached)
+        
         try:
             from ..vcxsrv_detector import VcXsrvDetector
             detector = VcXsrvDetector()
-            return detector.detect_vcxsrv()
+            info = detector.detect_vcxsrv()
+            _VCXSRV_CACHE[key] = (time.monotonic(), copy.deepcopy(info))
+            return info
         except Exception as e:
             logger.error(f"Failed to detect VcXsrv: {e}")
             return {'installed': False, 'running': False}
@@ -51,45 +99,41 @@ class VcXsrvScreenshot(ScreenshotBase):
         
         return None
     
-    def _detect_screenshot_tools(self) -> Dict[str, bool]:
-        """Detect available X11 screenshot tools"""
-        tools = {
-            'import': False,    # ImageMagick
-            'scrot': False,     # SCReenshOT
-            'xwd': False,       # X Window Dump
-            'gnome-screenshot': False
+    @staticmethod
+    def _probe_tools(search_path: Optional[str]) -> Dict[str, bool]:
+        """Check which X11 screenshot tools are on PATH"""
+        # Walk PATH in-process rather than spawning a probe per tool
+        return {
+            tool: shutil.which(tool, path=search_path) is not None
+            for tool in SCREENSHOT_TOOLS
         }
-        
+    
+    def _detect_screenshot_tools(self) -> Dict[str, bool]:
+        """Detect available X11 screenshot tools, scanning PATH only on a cache miss"""
         if not self.display:
-            return tools
+            return dict.fromkeys(SCREENSHOT_TOOLS, False)
         
-        # Set environment for X11
-        env = os.environ.copy()
-        env['DISPLAY'] = self.display
+        key = (self.display, os.environ.get('PATH', ''))
+        cached = _cache_get(_TOOL_CACHE, key)
+        if cached is not None:
+            return dict(cached)
         
-        for tool in tools.keys():
-            try:
-                result = subprocess.run(
-                    ['which', tool],
-                    capture_output=True,
-                    timeout=3,
-                    env=env
-                )
-                tools[tool] = result.returncode == 0
-            except Exception:
-                continue
+        tools = self._probe_tools((self._env or os.environ).get('PATH'))
         
         logger.info(f"Available screenshot tools: {[k for k, v in tools.items() if v]}")
+        _TOOL_CACHE[key] = (time.monotonic(), dict(tools))
         return tools
     
     def is_available(self) -> bool:
         """Check if VcXsrv screenshot is available"""
-        return (
-            self.vcxsrv_info.get('installed', False) and
-            self.vcxsrv_info.get('running', False) and
-            self.display is not None and
-            any(self.screenshot_tools.values())
-        )
+        if self._available is None:
+            self._available = (
+                bool(self.vcxsrv_info.get('installed', False)) and
+                bool(self.vcxsrv_info.get('running', False)) and
+                self.display is not None and
+                any(self.screenshot_tools.values())
+            )
+        return self._available
     
     def capture(self, **kwargs) -> bytes:
         """Capture screenshot using X11 tools via VcXsrv"""
@@ -104,6 +148,20 @@ class VcXsrvScreenshot(ScreenshotBase):
         
         logger.info(f"Capturing screenshot via VcXsrv display {self.display}")
         
+        # Race the stdout-capable tools so one hung tool doesn't stall the rest
+        race_commands = self._get_race_commands(**kwargs)
+        raced = set()
+        if len(race_commands) > 1:
+            import asyncio
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                try:
+                    return asyncio.run(self._capture_race(race_commands))
+                except ScreenshotCaptureError as e:
+                    logger.warning(f"Parallel capture failed: {e}")
+                    raced = {tool for tool, _ in race_commands}
+        
         # Try screenshot tools in order of preference
         methods = [
             ('import', self._capture_with_imagemagick),
@@ -113,6 +171,8 @@ class VcXsrvScreenshot(ScreenshotBase):
         ]
         
         for tool, method in methods:
+            if tool in raced:
+                continue
             if self.screenshot_tools.get(tool, False):
                 try:
                     return method(**kwargs)
@@ -125,143 +185,152 @@ class VcXsrvScreenshot(ScreenshotBase):
             "Ensure X11 screenshot tools are installed."
         )
     
-    def _capture_with_imagemagick(self, **kwargs) -> bytes:
-        """Capture using ImageMagick import command"""
+    def _get_race_commands(self, **kwargs) -> List[Tuple[str, List[str]]]:
+        """Get commands for available tools that write PNG to stdout"""
         region = kwargs.get('region')
+        builders = [
+            ('import', self._build_import_command),
+            ('scrot', self._build_scrot_command)
+        ]
+        return [
+            (tool, build(region))
+            for tool, build in builders
+            if self.screenshot_tools.get(tool, False)
+        ]
+    
+    async def _capture_race(self, commands: List[Tuple[str, List[str]]]) -> bytes:
+        """Run capture commands concurrently and return the first valid PNG"""
+        import asyncio
         
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp:
-            tmp_path = tmp.name
-        
-        try:
-            # Build import command
-            cmd = ['import']
-            
-            if region:
-                # Specific region: import -window root -crop WxH+X+Y
-                cmd.extend([
-                    '-window', 'root',
-                    '-crop', f"{region['width']}x{region['height']}+{region['x']}+{region['y']}"
-                ])
-            else:
-                # Full screen: import -window root
-                cmd.extend(['-window', 'root'])
-            
-            cmd.append(tmp_path)
-            
-            # Set X11 environment
-            env = os.environ.copy()
-            env['DISPLAY'] = self.display
-            
-            # Execute import command
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                timeout=10,
-                env=env
+        async def _run(tool: str, cmd: List[str]) -> bytes:
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+                env=self._env
             )
-            
-            if result.returncode != 0:
-                raise Exception(f"import command failed: {result.stderr.decode()}")
-            
-            # Read the image data
-            with open(tmp_path, 'rb') as f:
-                return f.read()
-                
-        finally:
-            # Cleanup temp file
             try:
-                os.unlink(tmp_path)
-            except:
-                pass
+                stdout, _ = await asyncio.wait_for(proc.communicate(), timeout=10)
+            except BaseException:
+                # Timed out or lost the race
+                if proc.returncode is None:
+                    proc.kill()
+                    await proc.wait()
+                raise
+            
+            if proc.returncode != 0 or not stdout.startswith(PNG_MAGIC):
+                raise ScreenshotCaptureError(f"{tool} exited with code {proc.returncode}")
+            return stdout
+        
+        pending = {asyncio.ensure_future(_run(tool, cmd)) for tool, cmd in commands}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    for other in pending:
+                        other.cancel()
+                    await asyncio.gather(*pending, return_exceptions=True)
+                    return task.result()
+                logger.debug(f"Parallel capture attempt failed: {task.exception()}")
+        
+        raise ScreenshotCaptureError("No screenshot tool produced a PNG")
+    
+    def _build_import_command(self, region: Optional[Dict[str, int]] = None) -> List[str]:
+        """Build ImageMagick import command writing PNG to stdout"""
+        cmd = ['import', '-window', 'root']
+        
+        if region:
+            # Specific region: import -window root -crop WxH+X+Y
+            cmd.extend([
+                '-crop', f"{region['width']}x{region['height']}+{region['x']}+{region['y']}"
+            ])
+        
+        # Write PNG to stdout instead of a temp file
+        cmd.append('png:-')
+        return cmd
+    
+    def _build_scrot_command(self, region: Optional[Dict[str, int]] = None) -> List[str]:
+        """Build scrot command writing PNG to stdout"""
+        cmd = ['scrot']
+        
+        if region:
+            # Specific region: scrot -a x,y,w,h
+            cmd.extend([
+                '-a', f"{region['x']},{region['y']},{region['width']},{region['height']}"
+            ])
+        
+        # '-' makes scrot write the PNG to stdout
+        cmd.append('-')
+        return cmd
+    
+    def _capture_with_imagemagick(self, **kwargs) -> bytes:
+        """Capture using ImageMagick import command"""
+        cmd = self._build_import_command(kwargs.get('region'))
+        
+        # Execute import command
+        result = subprocess.run(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            timeout=10,
+            env=self._env
+        )
+        
+        if result.returncode != 0:
+            raise Exception(f"import command failed: {result.stderr.decode('utf-8', 'replace')}")
+        
+        return result.stdout
     
     def _capture_with_scrot(self, **kwargs) -> bytes:
         """Capture using scrot command"""
-        region = kwargs.get('region')
+        cmd = self._build_scrot_command(kwargs.get('region'))
         
-        with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp:
-            tmp_path = tmp.name
+        result = subprocess.run(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            timeout=10,
+            env=self._env
+        )
         
-        try:
-            cmd = ['scrot']
-            
-            if region:
-                # Specific region: scrot -a x,y,w,h
-                cmd.extend([
-                    '-a', f"{region['x']},{region['y']},{region['width']},{region['height']}"
-                ])
-            
-            cmd.append(tmp_path)
-            
-            env = os.environ.copy()
-            env['DISPLAY'] = self.display
-            
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                timeout=10,
-                env=env
-            )
-            
-            if result.returncode != 0:
-                raise Exception(f"scrot command failed: {result.stderr.decode()}")
-            
-            with open(tmp_path, 'rb') as f:
-                return f.read()
-                
-        finally:
-            try:
-                os.unlink(tmp_path)
-            except:
-                pass
+        if result.returncode != 0:
+            raise Exception(f"scrot command failed: {result.stderr.decode('utf-8', 'replace')}")
+        
+        return result.stdout
     
     def _capture_with_xwd(self, **kwargs) -> bytes:
         """Capture using xwd command"""
-        # xwd produces XWD format, need to convert to PNG
-        
-        with tempfile.NamedTemporaryFile(suffix='.xwd', delete=False) as xwd_tmp:
-            xwd_path = xwd_tmp.name
-            
-        with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as png_tmp:
-            png_path = png_tmp.name
+        # xwd produces XWD format, pipe it through convert to get PNG
+        xwd = subprocess.Popen(
+            ['xwd', '-root'],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            env=self._env
+        )
         
         try:
-            # Capture with xwd
-            cmd = ['xwd', '-root', '-out', xwd_path]
-            
-            env = os.environ.copy()
-            env['DISPLAY'] = self.display
-            
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                timeout=10,
-                env=env
-            )
-            
-            if result.returncode != 0:
-                raise Exception(f"xwd command failed: {result.stderr.decode()}")
-            
-            # Convert XWD to PNG using ImageMagick convert
-            convert_cmd = ['convert', xwd_path, png_path]
-            convert_result = subprocess.run(
-                convert_cmd,
-                capture_output=True,
+            convert = subprocess.run(
+                ['convert', 'xwd:-', 'png:-'],
+                stdin=xwd.stdout,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
                 timeout=10
             )
-            
-            if convert_result.returncode != 0:
-                raise Exception(f"XWD to PNG conversion failed: {convert_result.stderr.decode()}")
-            
-            with open(png_path, 'rb') as f:
-                return f.read()
-                
         finally:
-            for path in [xwd_path, png_path]:
-                try:
-                    os.unlink(path)
-                except:
-                    pass
+            xwd.stdout.close()
+            try:
+                xwd.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                xwd.kill()
+                xwd.wait()
+        
+        if xwd.returncode != 0:
+            raise Exception(f"xwd command failed: {xwd.stderr.read().decode('utf-8', 'replace')}")
+        
+        if convert.returncode != 0:
+            raise Exception(f"XWD to PNG conversion failed: {convert.stderr.decode('utf-8', 'replace')}")
+        
+        return convert.stdout
     
     def _capture_with_gnome(self, **kwargs) -> bytes:
         """Capture using gnome-screenshot"""
@@ -280,18 +349,16 @@ class VcXsrvScreenshot(ScreenshotBase):
                 # Full screen
                 cmd.append('--window')
             
-            env = os.environ.copy()
-            env['DISPLAY'] = self.display
-            
             result = subprocess.run(
                 cmd,
-                capture_output=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
                 timeout=10,
-                env=env
+                env=self._env
             )
             
             if result.returncode != 0:
-                raise Exception(f"gnome-screenshot failed: {result.stderr.decode()}")
+                raise Exception(f"gnome-screenshot failed: {result.stderr.decode('utf-8', 'replace')}")
             
             with open(tmp_path, 'rb') as f:
                 return f.read()
@@ -310,51 +377,29 @@ class VcXsrvScreenshot(ScreenshotBase):
         monitors = []
         
         try:
-            env = os.environ.copy()
-            env['DISPLAY'] = self.display
-            
             # Try xrandr for monitor info
             result = subprocess.run(
                 ['xrandr', '--query'],
-                capture_output=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
                 text=True,
                 timeout=5,
-                env=env
+                env=self._env
             )
             
             if result.returncode == 0:
-                # Parse xrandr output
-                current_monitor = None
-                
-                for line in result.stdout.split('\n'):
-                    line = line.strip()
-                    
-                    if ' connected ' in line:
-                        # Monitor line: "DisplayPort-0 connected 1920x1080+0+0 ..."
-                        parts = line.split()
-                        name = parts[0]
-                        
-                        if len(parts) >= 3:
-                            resolution_part = parts[2]
-                            if 'x' in resolution_part and '+' in resolution_part:
-                                # Parse "1920x1080+0+0"
-                                res_pos = resolution_part.split('+')
-                                if len(res_pos) >= 3:
-                                    width_height = res_pos[0]
-                                    x_offset = int(res_pos[1])
-                                    y_offset = int(res_pos[2])
-                                    
-                                    if 'x' in width_height:
-                                        width, height = map(int, width_height.split('x'))
-                                        
-                                        monitors.append({
-                                            'name': name,
-                                            'width': width,
-                                            'height': height,
-                                            'x': x_offset,
-                                            'y': y_offset,
-                                            'primary': 'primary' in line
-                                        })
+                # Monitor line: "DisplayPort-0 connected primary 1920x1080+0+0 ..."
+                for line in result.stdout.splitlines():
+                    match = _XRANDR_RE.match(line)
+                    if match:
+                        monitors.append({
+                            'name': match['name'],
+                            'width': int(match['w']),
+                            'height': int(match['h']),
+                            'x': int(match['x']),
+                            'y': int(match['y']),
+                            'primary': match['primary'] is not None
+                        })
             
         except Exception as e:
             logger.debug(f"Failed to get monitor info via xrandr: {e}")
@@ -404,9 +449,14 @@ class VcXsrvScreenshot(ScreenshotBase):
             if result['success']:
                 # Refresh our state
                 self._cache = None
+                _VCXSRV_CACHE.pop(os.environ.get('PATH', ''), None)
+                if self.display:
+                    _TOOL_CACHE.pop((self.display, os.environ.get('PATH', '')), None)
                 self.vcxsrv_info = self._detect_vcxsrv()
                 self.display = self._get_display()
+                self._env = self._build_env()
                 self.screenshot_tools = self._detect_screenshot_tools()
+                self._available = None
             
             return result
             
@@ -3,16 +3,70 @@ Windows screenshot implementation for computer-use-mcp
 Supports native Windows and WSL2 environments
 """
 
+import base64
+import functools
 import os
 import sys
+import select
+import struct
 import subprocess
-import tempfile
+import threading
+import time
+import zlib
 import logging
 from typing import Optional, Dict, Any, List, Tuple
 from .base import ScreenshotBase, ScreenshotCaptureError
 
 logger = logging.getLogger(__name__)
 
+SRCCOPY = 0x00CC0020
+
+# capture() kwargs forwarded to the image encoder
+ENCODE_OPTIONS = ('compress_level', 'format', 'quality')
+
+
+def _bgrx_to_rgb(pixels, width: int, height: int):
+    """Reorder 32bpp BGRX pixels into packed RGB"""
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+    
+    if np is not None:
+        # One vectorized gather: drop X and reverse BGR in a single pass
+        bgrx = np.frombuffer(pixels, dtype=np.uint8).reshape(height, width, 4)
+        return np.ascontiguousarray(bgrx[..., 2::-1]).tobytes()
+    
+    # Without numpy, three strided slice copies still run in C
+    rgb = bytearray(width * height * 3)
+    rgb[0::3] = pixels[2::4]
+    rgb[1::3] = pixels[1::4]
+    rgb[2::3] = pixels[0::4]
+    return rgb
+
+
+def _png_chunk(tag: bytes, data: bytes) -> bytes:
+    """Build a PNG chunk with length and CRC"""
+    return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data))
+
+
+def _write_png(rgb, width: int, height: int, level: int = 1) -> bytes:
+    """Encode packed 8-bit RGB rows as a PNG without Pillow"""
+    stride = width * 3
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 15)
+    idat = []
+    for offset in range(0, stride * height, stride):
+        # Filter type 0 (None) for every scanline
+        idat.append(compressor.compress(b'\x00'))
+        idat.append(compressor.compress(rgb[offset:offset + stride]))
+    idat.append(compressor.flush())
+    
+    ihdr = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return (b'\x89PNG\r\n\x1a\n' +
+            _png_chunk(b'IHDR', ihdr) +
+            _png_chunk(b'IDAT', b''.join(idat)) +
+            _png_chunk(b'IEND', b''))
+
 
 class WindowsScreenshot(ScreenshotBase):
     """Native Windows screenshot implementation using ctypes"""
@@ -20,87 +74,195 @@ class WindowsScreenshot(ScreenshotBase):
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         super().__init__(config)
         self._import_windows_libs()
+        # Pixel buffer reused across captures when config['reuse_buffer'] is set
+        self._pixel_buf = None
+        self._pixel_buf_size = 0
+        # Display geometry, cached until invalidate_display_cache()
+        self._metrics_cache: Optional[Tuple[int, int]] = None
+        self._monitors_cache: Optional[List[Dict[str, Any]]] = None
+        # Memory DC and bitmap kept across captures, rebuilt on size change
+        self._hdc_mem = None
+        self._hbitmap = None
+        self._bmp_size: Optional[Tuple[int, int]] = None
+        self._gdi_lock = threading.Lock()
     
     def _import_windows_libs(self):
-        """Import Windows-specific libraries"""
+        """Check the platform; Windows DLLs and types load on first use"""
         if sys.platform != 'win32':
             raise ImportError("WindowsScreenshot requires Windows platform")
         
         import ctypes
+        self.ctypes = ctypes
+    
+    @functools.cached_property
+    def wintypes(self):
         from ctypes import wintypes
+        return wintypes
+    
+    @functools.cached_property
+    def user32(self):
+        user32 = self.ctypes.windll.user32
+        wt = self.wintypes
+        c_int = self.ctypes.c_int
         
-        self.ctypes = ctypes
-        self.wintypes = wintypes
-        self.user32 = ctypes.windll.user32
-        self.gdi32 = ctypes.windll.gdi32
-        self.kernel32 = ctypes.windll.kernel32
+        # Explicit prototypes keep HANDLEs pointer-sized on 64-bit and let
+        # ctypes skip per-call argument guessing on the capture hot path
+        user32.GetDC.argtypes = [wt.HWND]
+        user32.GetDC.restype = wt.HDC
+        user32.ReleaseDC.argtypes = [wt.HWND, wt.HDC]
+        user32.ReleaseDC.restype = c_int
+        user32.GetSystemMetrics.argtypes = [c_int]
+        user32.GetSystemMetrics.restype = c_int
+        return user32
+    
+    @functools.cached_property
+    def gdi32(self):
+        gdi32 = self.ctypes.windll.gdi32
+        wt = self.wintypes
+        c_int = self.ctypes.c_int
+        
+        gdi32.CreateCompatibleDC.argtypes = [wt.HDC]
+        gdi32.CreateCompatibleDC.restype = wt.HDC
+        gdi32.CreateCompatibleBitmap.argtypes = [wt.HDC, c_int, c_int]
+        gdi32.CreateCompatibleBitmap.restype = wt.HBITMAP
+        gdi32.SelectObject.argtypes = [wt.HDC, wt.HGDIOBJ]
+        gdi32.SelectObject.restype = wt.HGDIOBJ
+        gdi32.BitBlt.argtypes = [wt.HDC, c_int, c_int, c_int, c_int,
+                                 wt.HDC, c_int, c_int, wt.DWORD]
+        gdi32.BitBlt.restype = wt.BOOL
+        gdi32.GetDIBits.argtypes = [wt.HDC, wt.HBITMAP, wt.UINT, wt.UINT,
+                                    self.ctypes.c_void_p,
+                                    self.ctypes.POINTER(self.BITMAPINFOHEADER),
+                                    wt.UINT]
+        gdi32.GetDIBits.restype = c_int
+        gdi32.DeleteObject.argtypes = [wt.HGDIOBJ]
+        gdi32.DeleteObject.restype = wt.BOOL
+        gdi32.DeleteDC.argtypes = [wt.HDC]
+        gdi32.DeleteDC.restype = wt.BOOL
+        return gdi32
+    
+    @functools.cached_property
+    def kernel32(self):
+        return self.ctypes.windll.kernel32
+    
+    @functools.cached_property
+    def BITMAPINFOHEADER(self):
+        wintypes = self.wintypes
+        
+        # wintypes does not ship BITMAPINFOHEADER, so declare it here
+        class BITMAPINFOHEADER(self.ctypes.Structure):
+            _fields_ = [
+                ('biSize', wintypes.DWORD),
+                ('biWidth', wintypes.LONG),
+                ('biHeight', wintypes.LONG),
+                ('biPlanes', wintypes.WORD),
+                ('biBitCount', wintypes.WORD),
+                ('biCompression', wintypes.DWORD),
+                ('biSizeImage', wintypes.DWORD),
+                ('biXPelsPerMeter', wintypes.LONG),
+                ('biYPelsPerMeter', wintypes.LONG),
+                ('biClrUsed', wintypes.DWORD),
+                ('biClrImportant', wintypes.DWORD),
+            ]
+        
+        return BITMAPINFOHEADER
     
     def capture(self, **kwargs) -> bytes:
-        """Capture screenshot using Windows API"""
+        """
+        Capture screenshot using Windows API
+        
+        Besides region/monitor, accepts encoder options: compress_level
+        (PNG zlib level, default 1 for speed), format ('PNG' or 'JPEG')
+        and quality (JPEG only, default 85).
+        """
         region = kwargs.get('region')
         monitor = kwargs.get('monitor')
+        encode = {key: kwargs[key] for key in ENCODE_OPTIONS if key in kwargs}
         
         if monitor:
-            return self._capture_monitor(self.get_monitors()[monitor - 1])
+            return self._capture_monitor(self.get_monitors()[monitor - 1], **encode)
         elif region:
-            return self._capture_region(**region)
+            return self._capture_region(**region, **encode)
         else:
-            return self._capture_full_screen()
+            return self._capture_full_screen(**encode)
     
-    def _capture_full_screen(self) -> bytes:
+    def _capture_full_screen(self, **encode) -> bytes:
         """Capture entire screen"""
         # Get screen dimensions
-        width = self.user32.GetSystemMetrics(0)  # SM_CXSCREEN
-        height = self.user32.GetSystemMetrics(1)  # SM_CYSCREEN
+        if self._metrics_cache is None:
+            self._metrics_cache = (
+                self.user32.GetSystemMetrics(0),  # SM_CXSCREEN
+                self.user32.GetSystemMetrics(1)   # SM_CYSCREEN
+            )
+        width, height = self._metrics_cache
         
-        return self._capture_bitmap(0, 0, width, height)
+        return self._capture_bitmap(0, 0, width, height, **encode)
+    
+    def invalidate_display_cache(self):
+        """Forget cached screen metrics and monitors (e.g. after WM_DISPLAYCHANGE)"""
+        self._metrics_cache = None
+        self._monitors_cache = None
     
-    def _capture_region(self, x: int, y: int, width: int, height: int) -> bytes:
+    def _capture_region(self, x: int, y: int, width: int, height: int, **encode) -> bytes:
         """Capture specific region"""
-        return self._capture_bitmap(x, y, width, height)
+        return self._capture_bitmap(x, y, width, height, **encode)
     
-    def _capture_bitmap(self, x: int, y: int, width: int, height: int) -> bytes:
+    def _capture_bitmap(self, x: int, y: int, width: int, height: int, **encode) -> bytes:
         """Capture bitmap and convert to PNG"""
-        # Get device contexts
-        hdc_screen = self.user32.GetDC(0)
-        hdc_mem = self.gdi32.CreateCompatibleDC(hdc_screen)
-        
-        # Create bitmap
-        hbitmap = self.gdi32.CreateCompatibleBitmap(hdc_screen, width, height)
-        self.gdi32.SelectObject(hdc_mem, hbitmap)
-        
-        # Copy screen to bitmap
-        self.gdi32.BitBlt(hdc_mem, 0, 0, width, height, hdc_screen, x, y, 0x00CC0020)  # SRCCOPY
-        
-        # Convert to PNG bytes
-        png_data = self._bitmap_to_png(hbitmap, width, height)
-        
-        # Cleanup
-        self.gdi32.DeleteObject(hbitmap)
-        self.gdi32.DeleteDC(hdc_mem)
-        self.user32.ReleaseDC(0, hdc_screen)
-        
-        return png_data
-    
-    def _bitmap_to_png(self, hbitmap, width: int, height: int) -> bytes:
-        """Convert Windows bitmap to PNG bytes"""
-        # This is simplified - in production would use PIL or similar
-        # For now, create a minimal PNG
-        import struct
-        import zlib
-        
-        # Get bitmap bits
-        bmp_info = self.wintypes.BITMAPINFOHEADER()
-        bmp_info.biSize = self.ctypes.sizeof(self.wintypes.BITMAPINFOHEADER)
+        with self._gdi_lock:
+            hdc_screen = self.user32.GetDC(0)
+            try:
+                # Reuse the memory DC and bitmap unless the size changed
+                if self._hdc_mem is None:
+                    self._hdc_mem = self.gdi32.CreateCompatibleDC(hdc_screen)
+                if self._bmp_size != (width, height):
+                    # Select the new bitmap first; GDI won't delete a selected one
+                    old_bitmap = self._hbitmap
+                    self._hbitmap = self.gdi32.CreateCompatibleBitmap(hdc_screen, width, height)
+                    self.gdi32.SelectObject(self._hdc_mem, self._hbitmap)
+                    if old_bitmap:
+                        self.gdi32.DeleteObject(old_bitmap)
+                    self._bmp_size = (width, height)
+                
+                # Copy screen to bitmap
+                self.gdi32.BitBlt(self._hdc_mem, 0, 0, width, height,
+                                  hdc_screen, x, y, SRCCOPY)
+            finally:
+                self.user32.ReleaseDC(0, hdc_screen)
+            
+            # Convert to PNG bytes
+            return self._bitmap_to_png(self._hbitmap, width, height, **encode)
+    
+    def close(self):
+        """Release the cached GDI memory DC and bitmap"""
+        if self._hdc_mem:
+            self.gdi32.DeleteDC(self._hdc_mem)
+        if self._hbitmap:
+            self.gdi32.DeleteObject(self._hbitmap)
+        self._hbitmap = None
+        self._hdc_mem = None
+        self._bmp_size = None
+    
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+    
+    def _bitmap_to_png(self, hbitmap, width: int, height: int, compress_level: int = 1,
+                       format: str = 'PNG', quality: int = 85) -> bytes:
+        """Convert Windows bitmap to PNG (or JPEG) bytes"""
+        # Request a top-down 32bpp DIB so no flip is needed afterwards
+        bmp_info = self.BITMAPINFOHEADER()
+        bmp_info.biSize = self.ctypes.sizeof(self.BITMAPINFOHEADER)
         bmp_info.biWidth = width
         bmp_info.biHeight = -height  # Top-down
         bmp_info.biPlanes = 1
         bmp_info.biBitCount = 32
         bmp_info.biCompression = 0  # BI_RGB
         
-        # Allocate buffer for pixels
         pixels_size = width * height * 4
-        pixels = (self.ctypes.c_byte * pixels_size)()
+        pixels = self._get_pixel_buffer(pixels_size)
         
         # Get bitmap bits
         hdc = self.gdi32.CreateCompatibleDC(0)
@@ -108,12 +270,43 @@ class WindowsScreenshot(ScreenshotBase):
                              self.ctypes.byref(bmp_info), 0)  # DIB_RGB_COLORS
         self.gdi32.DeleteDC(hdc)
         
-        # Create minimal PNG (placeholder for now)
-        # In production, use PIL: Image.frombytes('RGBA', (width, height), pixels)
-        png_header = b'\x89PNG\r\n\x1a\n'
+        # Let PIL's raw decoder do the BGRX -> RGB swap in C, straight from
+        # the ctypes buffer. GDI leaves the fourth byte undefined, so it is
+        # dropped rather than treated as alpha.
+        view = memoryview(pixels).cast('B')[:pixels_size]
+        try:
+            import io
+            from PIL import Image
+        except ImportError:
+            return _write_png(_bgrx_to_rgb(view, width, height), width, height, compress_level)
+        
+        image = Image.frombuffer('RGB', (width, height), view, 'raw', 'BGRX', width * 4, 1)
+        
+        buffer = io.BytesIO()
+        if format.upper() in ('JPEG', 'JPG'):
+            image.save(buffer, format='JPEG', quality=quality)
+        else:
+            # Favour encode speed over size for interactive capture
+            image.save(buffer, format='PNG', compress_level=compress_level)
+        return buffer.getvalue()
+    
+    def _get_pixel_buffer(self, size: int):
+        """
+        Get a buffer for GetDIBits output
         
-        # For testing, return recognizable PNG data
-        return png_header + b'MOCK_WINDOWS_SCREENSHOT_DATA'
+        With config['reuse_buffer'] a single buffer is kept on the instance and
+        only reallocated when the capture grows; its contents are valid until
+        the next capture() call, so the instance must not be shared across
+        threads in that mode.
+        """
+        if not self.config.get('reuse_buffer'):
+            return (self.ctypes.c_byte * size)()
+        
+        if size > self._pixel_buf_size:
+            self._pixel_buf = (self.ctypes.c_byte * size)()
+            self._pixel_buf_size = size
+        
+        return self._pixel_buf
     
     def is_available(self) -> bool:
         """Check if Windows screenshot is available"""
@@ -121,6 +314,9 @@ class WindowsScreenshot(ScreenshotBase):
     
     def get_monitors(self) -> List[Dict[str, Any]]:
         """Get monitor information"""
+        if self._monitors_cache is not None:
+            return list(self._monitors_cache)
+        
         monitors = []
         
         def enum_monitors_callback(hmonitor, hdc, rect, data):
@@ -145,100 +341,172 @@ class WindowsScreenshot(ScreenshotBase):
         
         self.user32.EnumDisplayMonitors(0, 0, enum_proc, 0)
         
-        return monitors
+        self._monitors_cache = monitors
+        return list(monitors)
     
-    def _capture_monitor(self, monitor_info: Dict[str, Any]) -> bytes:
+    def _capture_monitor(self, monitor_info: Dict[str, Any], **encode) -> bytes:
         """Capture specific monitor"""
         return self._capture_bitmap(
             monitor_info['x'],
             monitor_info['y'],
             monitor_info['width'],
-            monitor_info['height']
+            monitor_info['height'],
+            **encode
         )
 
 
 class WSL2Screenshot(ScreenshotBase):
     """WSL2 screenshot implementation using PowerShell"""
     
+    # Sentinel written after each script run on the persistent shell
+    PS_SENTINEL = '__END__'
+    PS_TIMEOUT = 10
+    # Pipe reads are this size so a multi-MB base64 line takes few syscalls
+    PS_READ_SIZE = 1 << 16
+    
+    CAPTURE_SCRIPT = [
+        'Add-Type -AssemblyName System.Windows.Forms',
+        'Add-Type -AssemblyName System.Drawing',
+        '$bounds = [System.Windows.Forms.Screen]::PrimaryScreen.Bounds',
+        '$bitmap = New-Object System.Drawing.Bitmap($bounds.Width, $bounds.Height)',
+        '$graphics = [System.Drawing.Graphics]::FromImage($bitmap)',
+        '$graphics.CopyFromScreen(0, 0, 0, 0, $bounds.Size)',
+        '$ms = New-Object System.IO.MemoryStream',
+        '$bitmap.Save($ms, [System.Drawing.Imaging.ImageFormat]::Png)',
+        '$graphics.Dispose()',
+        '$bitmap.Dispose()',
+    ]
+    
+    # One-shot runs write raw PNG bytes to stdout; the persistent shell's
+    # line protocol needs the PNG base64 encoded on a single line
+    STDOUT_TAIL = [
+        '$stdout = [Console]::OpenStandardOutput()',
+        '$ms.WriteTo($stdout)',
+        '$stdout.Flush()',
+    ]
+    BASE64_TAIL = [
+        'Write-Output ([Convert]::ToBase64String($ms.ToArray()))',
+    ]
+    
+    def _setup(self):
+        """Setup persistent PowerShell state"""
+        self._ps_proc: Optional[subprocess.Popen] = None
+        self._ps_persistent = True
+        self._ps_lock = threading.Lock()
+    
     def capture(self, **kwargs) -> bytes:
         """Capture screenshot via PowerShell"""
         return self.capture_via_powershell(**kwargs)
     
     def capture_via_powershell(self, **kwargs) -> bytes:
         """Capture screenshot using PowerShell from WSL2"""
-        ps_command = self._get_powershell_command()
-        
         try:
-            result = subprocess.run(
-                ['powershell.exe'] + ps_command,
-                capture_output=True,
-                timeout=10
-            )
-            
-            if result.returncode != 0:
-                raise ScreenshotCaptureError(f"PowerShell failed: {result.stderr.decode()}")
-            
-            # Get temp file path from output
-            temp_path = result.stdout.decode().strip()
-            
-            # Convert Windows path to WSL path
-            wsl_path = self._convert_windows_path(temp_path)
-            
-            if not os.path.exists(wsl_path):
-                raise ScreenshotCaptureError(f"Screenshot file not found: {wsl_path}")
+            if self._ps_persistent:
+                try:
+                    encoded = self._run_persistent('; '.join(self.CAPTURE_SCRIPT + self.BASE64_TAIL))
+                    return base64.b64decode(encoded)
+                except OSError as e:
+                    # powershell.exe missing or pipe broken: spawn per call from now on
+                    logger.debug(f"Persistent PowerShell unavailable: {e}")
+                    self._ps_persistent = False
+                    self.close()
             
-            # Read screenshot data
-            with open(wsl_path, 'rb') as f:
-                data = f.read()
-            
-            # Cleanup
-            os.unlink(wsl_path)
-            
-            return data
+            return self._run_once()
             
         except subprocess.TimeoutExpired:
             raise ScreenshotCaptureError("PowerShell screenshot timed out")
         except Exception as e:
             raise ScreenshotCaptureError(f"Screenshot failed: {e}")
     
+    def _run_once(self) -> bytes:
+        """Run the capture script in a fresh PowerShell and return the PNG bytes"""
+        result = subprocess.run(
+            ['powershell.exe'] + self._get_powershell_command(),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            timeout=self.PS_TIMEOUT
+        )
+        
+        if result.returncode != 0:
+            raise ScreenshotCaptureError(f"PowerShell failed: {result.stderr.decode('utf-8', 'replace')}")
+        
+        if not result.stdout:
+            raise ScreenshotCaptureError("PowerShell produced no image data")
+        
+        return result.stdout
+    
+    def _run_persistent(self, script: str) -> str:
+        """Run a one-line script on the long-lived PowerShell and return its output"""
+        with self._ps_lock:
+            if self._ps_proc is None or self._ps_proc.poll() is not None:
+                self._ps_proc = subprocess.Popen(
+                    ['powershell.exe', '-NoProfile', '-ExecutionPolicy', 'Bypass',
+                     '-Command', '-'],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                    bufsize=0
+                )
+            
+            proc = self._ps_proc
+            proc.stdin.write(f"{script}; Write-Output '{self.PS_SENTINEL}'\n".encode())
+            
+            # stdout is unbuffered, so read it in large chunks rather than
+            # readline() (one byte per syscall); the deadline covers the
+            # whole response, not just its first byte
+            fd = proc.stdout.fileno()
+            sentinel = self.PS_SENTINEL.encode()
+            output = bytearray()
+            deadline = time.monotonic() + self.PS_TIMEOUT
+            while True:
+                remaining = deadline - time.monotonic()
+                ready, _, _ = select.select([fd], [], [], max(remaining, 0))
+                if not ready:
+                    self.close()
+                    raise subprocess.TimeoutExpired('powershell.exe', self.PS_TIMEOUT)
+                
+                chunk = os.read(fd, self.PS_READ_SIZE)
+                if not chunk:
+                    raise BrokenPipeError("PowerShell exited unexpectedly")
+                output += chunk
+                
+                # Only the tail needs checking for the sentinel line
+                tail = bytes(output[-(len(sentinel) + 16):]).rstrip()
+                if tail.endswith(sentinel) and tail[:-len(sentinel)].rstrip(b' \t')[-1:] in (b'', b'\n'):
+                    break
+            
+            lines = [line.strip() for line in output.decode('utf-8', 'replace').splitlines()]
+            lines = [line for line in lines if line][:-1]  # drop the sentinel
+            if not lines:
+                raise ScreenshotCaptureError("PowerShell produced no output")
+            return lines[-1]
+    
+    def close(self):
+        """Terminate the persistent PowerShell process"""
+        proc, self._ps_proc = self._ps_proc, None
+        if proc is not None and proc.poll() is None:
+            try:
+                proc.stdin.close()
+                proc.terminate()
+                proc.wait(timeout=2)
+            except Exception:
+                proc.kill()
+    
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+    
     def _get_powershell_command(self) -> List[str]:
         """Get optimized PowerShell command for screenshot"""
         return [
             '-NoProfile',
             '-ExecutionPolicy', 'Bypass',
             '-Command',
-            '''
-            Add-Type -AssemblyName System.Windows.Forms
-            Add-Type -AssemblyName System.Drawing
-            $bounds = [System.Windows.Forms.Screen]::PrimaryScreen.Bounds
-            $bitmap = New-Object System.Drawing.Bitmap($bounds.Width, $bounds.Height)
-            $graphics = [System.Drawing.Graphics]::FromImage($bitmap)
-            $graphics.CopyFromScreen(0, 0, 0, 0, $bounds.Size)
-            $tempPath = [System.IO.Path]::GetTempPath() + "wsl_screenshot_" + [System.Guid]::NewGuid().ToString() + ".png"
-            $bitmap.Save($tempPath, [System.Drawing.Imaging.ImageFormat]::Png)
-            $graphics.Dispose()
-            $bitmap.Dispose()
-            Write-Output $tempPath
-            '''
+            '\n'.join(self.CAPTURE_SCRIPT + self.STDOUT_TAIL)
         ]
     
-    def _convert_windows_path(self, windows_path: str) -> str:
-        """Convert Windows path to WSL path"""
-        if windows_path.startswith('\\\\wsl$\\'):
-            # Already a WSL path
-            parts = windows_path.split('\\')
-            distro = parts[3]
-            path = '/'.join(parts[4:])
-            return '/' + path
-        elif windows_path[1:3] == ':\\':
-            # Drive letter path (C:\...)
-            drive = windows_path[0].lower()
-            path = windows_path[3:].replace('\\', '/')
-            return f'/mnt/{drive}/{path}'
-        else:
-            # Assume relative path
-            return windows_path.replace('\\', '/')
-    
     def is_available(self) -> bool:
         """Check if WSL2 PowerShell screenshot is available"""
         # Check if in WSL2
@@ -249,7 +517,8 @@ class WSL2Screenshot(ScreenshotBase):
         try:
             result = subprocess.run(
                 ['powershell.exe', '-Command', 'echo test'],
-                capture_output=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
                 timeout=2
             )
             return result.returncode == 0
@@ -275,7 +544,8 @@ class WSL2Screenshot(ScreenshotBase):
         try:
             result = subprocess.run(
                 ['powershell.exe', '-NoProfile', '-Command', ps_script],
-                capture_output=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
                 text=True,
                 timeout=5
             )
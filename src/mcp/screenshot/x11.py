@@ -2,153 +2,445 @@
 X11 screenshot implementation for Linux
 """
 
+import ctypes
+import ctypes.util
+import functools
+import importlib.util
+import io
 import os
+import re
+import shutil
+import signal
 import subprocess
-import tempfile
+import threading
+import time
 import logging
-from typing import Optional, Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional, Dict, Any, List, Sequence, Tuple
 from .base import ScreenshotBase, ScreenshotCaptureError
 
 logger = logging.getLogger(__name__)
 
+# Screenshots are consumed once, so favour encode speed over PNG size
+IMPORT_PNG_FLAGS = [
+    '-define', 'png:compression-level=1',
+    '-define', 'png:compression-filter=0',
+    '-define', 'png:compression-strategy=0',
+]
+
+# ImageMagick output options per format; WebP method 0 is the fastest encoder
+IMPORT_FORMAT_FLAGS = {
+    'png': IMPORT_PNG_FLAGS,
+    'webp': ['-define', 'webp:method=0'],
+}
+
+PNG_MAGIC = b'\x89PNG'
+
+
+def _check_image(data: Any, fmt: str) -> bytes:
+    """Return data if it starts with the magic of the requested format"""
+    if not data:
+        raise ScreenshotCaptureError("Capture produced no output")
+    if fmt == 'webp':
+        valid = data[:4] == b'RIFF' and data[8:12] == b'WEBP'
+    else:
+        valid = data.startswith(PNG_MAGIC)
+    if not valid:
+        raise ScreenshotCaptureError(f"Capture output is not a {fmt.upper()} image")
+    return data
+
+
+# Monitor line: "DP-1 connected primary 1920x1080+0+0 ..."
+_XRANDR_RE = re.compile(
+    r'^(?P<name>\S+) connected (?P<primary>primary )?'
+    r'(?P<w>\d+)x(?P<h>\d+)\+(?P<x>\d+)\+(?P<y>\d+)'
+)
+
+# Monitor layout rarely changes; re-query at most this often
+MONITORS_CACHE_TTL = 5.0
+
+
+class _XRRMonitorInfo(ctypes.Structure):
+    _fields_ = [
+        ('name', ctypes.c_ulong),       # Atom
+        ('primary', ctypes.c_int),
+        ('automatic', ctypes.c_int),
+        ('noutput', ctypes.c_int),
+        ('x', ctypes.c_int),
+        ('y', ctypes.c_int),
+        ('width', ctypes.c_int),
+        ('height', ctypes.c_int),
+        ('mwidth', ctypes.c_int),
+        ('mheight', ctypes.c_int),
+        ('outputs', ctypes.c_void_p),
+    ]
+
+
+@functools.lru_cache(maxsize=1)
+def _load_xrandr():
+    """Load libX11/libXrandr and declare the prototypes we use (None if missing)"""
+    try:
+        xlib = ctypes.CDLL(ctypes.util.find_library('X11') or 'libX11.so.6')
+        xrandr = ctypes.CDLL(ctypes.util.find_library('Xrandr') or 'libXrandr.so.2')
+    except OSError as e:
+        logger.debug(f"libXrandr not loadable: {e}")
+        return None
+    
+    xlib.XOpenDisplay.argtypes = [ctypes.c_char_p]
+    xlib.XOpenDisplay.restype = ctypes.c_void_p
+    xlib.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+    xlib.XDefaultRootWindow.restype = ctypes.c_ulong
+    xlib.XCloseDisplay.argtypes = [ctypes.c_void_p]
+    
+    xrandr.XRRGetMonitors.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.c_int,
+                                      ctypes.POINTER(ctypes.c_int)]
+    xrandr.XRRGetMonitors.restype = ctypes.POINTER(_XRRMonitorInfo)
+    xrandr.XRRFreeMonitors.argtypes = [ctypes.POINTER(_XRRMonitorInfo)]
+    
+    return xlib, xrandr
+
+
+def _stderr_text(stderr: Optional[bytes], limit: int = 512) -> str:
+    """Decode at most `limit` bytes of a failed tool's stderr for an error message"""
+    if not stderr:
+        return ''
+    return stderr[:limit].decode(errors='replace')
+
+
+def _kill_tree(proc: subprocess.Popen):
+    """SIGKILL a capture child and anything it spawned (own session)"""
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        proc.kill()
+
+
+class _ProcRegistry:
+    """Child processes started by one capture race, killed once it is decided"""
+    
+    def __init__(self):
+        self._procs: List[subprocess.Popen] = []
+        self._closed = False
+        self._lock = threading.Lock()
+    
+    def add(self, proc: subprocess.Popen):
+        with self._lock:
+            if not self._closed:
+                self._procs.append(proc)
+                return
+        # Race already over; don't let a late starter run to its timeout
+        _kill_tree(proc)
+    
+    def kill_all(self):
+        with self._lock:
+            self._closed = True
+            procs, self._procs = self._procs, []
+        for proc in procs:
+            if proc.poll() is None:
+                _kill_tree(proc)
+
 
 class X11Screenshot(ScreenshotBase):
     """X11 screenshot implementation using various tools"""
     
+    # (DISPLAY, available) from the last probe, shared by all instances
+    _availability_cache: Optional[Tuple[str, bool]] = None
+    _tools_cache: Optional[List[str]] = None
+    
+    # Full-screen PNG commands, the common MCP call, built once
+    _SCROT_FULL_CMD = ('scrot', '--silent', '-')
+    _IMPORT_FULL_CMD = ('import', '-window', 'root', *IMPORT_PNG_FLAGS, 'png:-')
+    
+    def _setup(self):
+        """Setup in-process capture state"""
+        # mss handle keeps its X connection open between captures
+        self._mss = None
+        self._mss_lock = threading.Lock()
+        # Xlib display opened on first get_monitors() via libXrandr
+        self._dpy = None
+        # Monitor layout, cached until MONITORS_CACHE_TTL or invalidate_display_cache()
+        self._monitors_cache: Optional[List[Dict[str, Any]]] = None
+        self._monitors_cache_ts = 0.0
+        # Capture method that last succeeded, tried alone on the next call
+        self._pinned_method = None
+    
     def capture(self, **kwargs) -> bytes:
-        """Capture screenshot using X11 tools"""
+        """
+        Capture screenshot using X11 tools
+        
+        Accepts format ('png' or 'webp', default 'png') and quality (WebP
+        quality, default 85) in addition to the base options.
+        """
+        # Plain capture() needs no option parsing; methods default to PNG
+        if kwargs:
+            fmt = kwargs.get('format', 'png').lower()
+            if fmt not in IMPORT_FORMAT_FLAGS:
+                raise ScreenshotCaptureError(f"Unsupported screenshot format: {fmt}")
+            kwargs['format'] = fmt
+        
+        pinned = self._pinned_method
+        if pinned is not None:
+            name, method = pinned
+            try:
+                return _check_image(method(**kwargs), kwargs.get('format', 'png'))
+            except Exception as e:
+                logger.debug(f"Pinned method {name} failed: {e}")
+                self._pinned_method = None
+        
+        try:
+            data = self._capture_with_mss(**kwargs)
+            self._pinned_method = ('mss', self._capture_with_mss)
+            return data
+        except Exception as e:
+            logger.debug(f"Method mss failed: {e}")
+        
+        return self._capture_race(**kwargs)
+    
+    def _capture_race(self, **kwargs) -> bytes:
+        """Run the CLI capture methods concurrently and keep the first success"""
         methods = [
-            self._capture_with_scrot,
-            self._capture_with_import,
-            self._capture_with_xwd,
+            ('scrot', self._capture_with_scrot),
+            ('import', self._capture_with_import),
+            ('xwd', self._capture_with_xwd),
         ]
+        # Tools is_available() found missing never join the race
+        tools = X11Screenshot._tools_cache
+        if tools is not None:
+            methods = [(name, method) for name, method in methods if name in tools]
+            if not methods:
+                raise ScreenshotCaptureError("No X11 capture tool found (scrot, import, xwd)")
+        
+        registry = _ProcRegistry()
+        executor = ThreadPoolExecutor(max_workers=len(methods))
+        futures = {executor.submit(method, _registry=registry, **kwargs): (name, method)
+                   for name, method in methods}
         
         last_error = None
-        for method in methods:
-            try:
-                return method(**kwargs)
-            except Exception as e:
-                last_error = e
-                logger.debug(f"Method {method.__name__} failed: {e}")
-                continue
+        try:
+            for future in as_completed(futures):
+                name, method = futures[future]
+                try:
+                    # A tool can exit 0 without writing an image to stdout
+                    data = _check_image(future.result(), kwargs.get('format', 'png'))
+                except Exception as e:
+                    last_error = e
+                    logger.debug(f"Method {name} failed: {e}")
+                    continue
+                self._pinned_method = (name, method)
+                return data
+        finally:
+            # Losers' children are killed so their threads exit promptly
+            registry.kill_all()
+            executor.shutdown(wait=False)
         
         raise ScreenshotCaptureError(f"All X11 methods failed: {last_error}")
     
-    def _capture_with_scrot(self, **kwargs) -> bytes:
-        """Capture using scrot"""
-        with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp:
-            tmp_path = tmp.name
+    def _run_tool(self, cmd: Sequence[str], registry: Optional[_ProcRegistry] = None) -> bytes:
+        """Run a capture command and return its stdout"""
+        # Own session so a timeout can reap the whole process group
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                start_new_session=True)
+        if registry is not None:
+            registry.add(proc)
         
         try:
-            cmd = ['scrot', '--silent', tmp_path]
+            stdout, stderr = proc.communicate(timeout=5)
+        except subprocess.TimeoutExpired:
+            _kill_tree(proc)
+            proc.wait()
+            raise ScreenshotCaptureError(f"{cmd[0]} timed out")
+        
+        if proc.returncode != 0:
+            raise ScreenshotCaptureError(f"{cmd[0]} failed (rc={proc.returncode}): {_stderr_text(stderr)}")
+        
+        return stdout
+    
+    def _capture_with_mss(self, **kwargs) -> bytes:
+        """Capture in-process with mss, no subprocess"""
+        import mss
+        import mss.tools
+        
+        with self._mss_lock:
+            if self._mss is None:
+                self._mss = mss.mss()
+            sct = self._mss
             
-            # Handle region capture
             region = kwargs.get('region')
+            monitor = kwargs.get('monitor')
             if region:
-                cmd.extend(['--select', f"{region['x']},{region['y']},{region['width']},{region['height']}"])
-            
-            result = subprocess.run(cmd, capture_output=True, timeout=5)
-            
-            if result.returncode != 0:
-                raise ScreenshotCaptureError(f"scrot failed: {result.stderr.decode()}")
+                area = {
+                    'left': region['x'],
+                    'top': region['y'],
+                    'width': region['width'],
+                    'height': region['height']
+                }
+            elif monitor:
+                area = sct.monitors[monitor]
+            else:
+                # monitors[0] is the union of all screens
+                area = sct.monitors[0]
             
-            with open(tmp_path, 'rb') as f:
-                return f.read()
-        finally:
-            if os.path.exists(tmp_path):
-                os.unlink(tmp_path)
+            img = sct.grab(area)
+        
+        if kwargs.get('format', 'png') == 'webp':
+            # Pillow is optional; without it let import/xwd produce the WebP
+            from PIL import Image
+            buffer = io.BytesIO()
+            Image.frombytes('RGB', img.size, img.rgb).save(
+                buffer, 'WEBP', quality=kwargs.get('quality', 85), method=0)
+            return buffer.getvalue()
+        
+        return mss.tools.to_png(img.rgb, img.size, level=kwargs.get('compress_level', 1))
+    
+    def close(self):
+        """Close the cached mss and Xlib display connections"""
+        with self._mss_lock:
+            if self._mss is not None:
+                self._mss.close()
+                self._mss = None
+        if self._dpy:
+            _load_xrandr()[0].XCloseDisplay(self._dpy)
+            self._dpy = None
+    
+    def _capture_with_scrot(self, **kwargs) -> bytes:
+        """Capture using scrot"""
+        if kwargs.get('format', 'png') != 'png':
+            raise ScreenshotCaptureError("scrot only streams PNG")
+        
+        region = kwargs.get('region')
+        if not region:
+            return self._run_tool(self._SCROT_FULL_CMD, kwargs.get('_registry'))
+        
+        # --autoselect takes x,y,w,h non-interactively; '-' writes the PNG
+        # to stdout, no temp file round-trip
+        cmd = ['scrot', '--silent',
+               '--autoselect', f"{region['x']},{region['y']},{region['width']},{region['height']}",
+               '-']
+        
+        return self._run_tool(cmd, kwargs.get('_registry'))
     
     def _capture_with_import(self, **kwargs) -> bytes:
         """Capture using ImageMagick import"""
-        cmd = ['import', '-window', 'root', 'png:-']
+        fmt = kwargs.get('format', 'png')
+        region = kwargs.get('region')
+        if not region and fmt == 'png':
+            return self._run_tool(self._IMPORT_FULL_CMD, kwargs.get('_registry'))
+        
+        cmd = ['import', '-window', 'root']
         
         # Handle region capture
-        region = kwargs.get('region')
         if region:
-            cmd = ['import', '-crop', 
-                   f"{region['width']}x{region['height']}+{region['x']}+{region['y']}", 
-                   'png:-']
+            cmd.extend(['-crop', f"{region['width']}x{region['height']}+{region['x']}+{region['y']}"])
         
-        result = subprocess.run(cmd, capture_output=True, timeout=5)
+        if fmt == 'webp':
+            cmd.extend(['-quality', str(kwargs.get('quality', 85))])
+        cmd.extend(IMPORT_FORMAT_FLAGS[fmt])
+        cmd.append(f'{fmt}:-')
         
-        if result.returncode != 0:
-            raise ScreenshotCaptureError(f"import failed: {result.stderr.decode()}")
-        
-        return result.stdout
+        return self._run_tool(cmd, kwargs.get('_registry'))
     
     def _capture_with_xwd(self, **kwargs) -> bytes:
         """Capture using xwd + convert"""
-        with tempfile.NamedTemporaryFile(suffix='.xwd', delete=False) as tmp:
-            tmp_path = tmp.name
+        fmt = kwargs.get('format', 'png')
+        encode = IMPORT_FORMAT_FLAGS[fmt]
+        if fmt == 'webp':
+            encode = ['-quality', str(kwargs.get('quality', 85))] + encode
+        
+        # Pipe the XWD dump straight into convert instead of spilling it to disk
+        xwd = subprocess.Popen(['xwd', '-root', '-silent'],
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                               start_new_session=True)
+        convert = subprocess.Popen(['convert', 'xwd:-', *encode, f'{fmt}:-'], stdin=xwd.stdout,
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                   start_new_session=True)
+        # Let xwd see SIGPIPE if convert exits early
+        xwd.stdout.close()
+        
+        registry = kwargs.get('_registry')
+        if registry is not None:
+            registry.add(xwd)
+            registry.add(convert)
         
         try:
-            # Capture with xwd
-            xwd_cmd = ['xwd', '-root', '-out', tmp_path]
-            result = subprocess.run(xwd_cmd, capture_output=True, timeout=5)
-            
-            if result.returncode != 0:
-                raise ScreenshotCaptureError(f"xwd failed: {result.stderr.decode()}")
-            
-            # Convert to PNG
-            convert_cmd = ['convert', tmp_path, 'png:-']
-            result = subprocess.run(convert_cmd, capture_output=True, timeout=5)
-            
-            if result.returncode != 0:
-                raise ScreenshotCaptureError(f"convert failed: {result.stderr.decode()}")
-            
-            return result.stdout
-        finally:
-            if os.path.exists(tmp_path):
-                os.unlink(tmp_path)
+            data, convert_err = convert.communicate(timeout=5)
+            xwd_err = xwd.communicate(timeout=5)[1]
+        except subprocess.TimeoutExpired:
+            for proc in (xwd, convert):
+                _kill_tree(proc)
+                proc.wait()
+            raise ScreenshotCaptureError("xwd | convert timed out")
+        
+        if xwd.returncode != 0:
+            raise ScreenshotCaptureError(f"xwd failed (rc={xwd.returncode}): {_stderr_text(xwd_err)}")
+        
+        if convert.returncode != 0:
+            raise ScreenshotCaptureError(f"convert failed (rc={convert.returncode}): {_stderr_text(convert_err)}")
+        
+        return data
     
     def is_available(self) -> bool:
         """Check if X11 screenshot is available"""
-        if not os.environ.get('DISPLAY'):
+        display = os.environ.get('DISPLAY')
+        if not display:
             return False
         
-        # Check if at least one tool is available
-        tools = ['scrot', 'import', 'xwd']
-        for tool in tools:
-            try:
-                result = subprocess.run(['which', tool], capture_output=True)
-                if result.returncode == 0:
-                    return True
-            except:
-                continue
+        # Tools rarely change during a process lifetime; re-probe only
+        # when DISPLAY changes
+        cached = X11Screenshot._availability_cache
+        if cached is not None and cached[0] == display:
+            return cached[1]
         
-        return False
+        # Check if mss or at least one tool is available
+        tools = [tool for tool in ('scrot', 'import', 'xwd') if shutil.which(tool)]
+        available = bool(tools) or importlib.util.find_spec('mss') is not None
+        
+        X11Screenshot._tools_cache = tools
+        X11Screenshot._availability_cache = (display, available)
+        return available
     
     def get_monitors(self) -> List[Dict[str, Any]]:
+        """Get monitor information, cached for MONITORS_CACHE_TTL seconds"""
+        now = time.monotonic()
+        if self._monitors_cache is not None and now - self._monitors_cache_ts < MONITORS_CACHE_TTL:
+            return list(self._monitors_cache)
+        
+        monitors = self._query_monitors()
+        self._monitors_cache = monitors
+        self._monitors_cache_ts = now
+        return list(monitors)
+    
+    def invalidate_display_cache(self):
+        """Forget cached monitors (e.g. after an RandR screen change)"""
+        self._monitors_cache = None
+    
+    def _query_monitors(self) -> List[Dict[str, Any]]:
         """Get monitor information using xrandr"""
+        # Ask libXrandr directly; fall back to parsing the xrandr CLI
+        try:
+            monitors = self._get_monitors_ffi()
+            if monitors:
+                return monitors
+        except Exception as e:
+            logger.debug(f"XRRGetMonitors unavailable: {e}")
+        
         try:
             result = subprocess.run(['xrandr'], capture_output=True, text=True)
             if result.returncode != 0:
                 return self._get_fallback_monitors()
             
             monitors = []
-            monitor_id = 1
             
-            for line in result.stdout.split('\n'):
-                if ' connected' in line and ' disconnected' not in line:
-                    parts = line.split()
-                    # Parse resolution and position
-                    geometry = parts[2] if parts[2] != 'primary' else parts[3]
-                    
-                    # Format: 1920x1080+0+0
-                    if '+' in geometry:
-                        res, pos = geometry.split('+', 1)
-                        width, height = map(int, res.split('x'))
-                        x, y = map(int, pos.split('+'))
-                        
-                        monitors.append({
-                            'id': monitor_id,
-                            'x': x,
-                            'y': y,
-                            'width': width,
-                            'height': height,
-                            'primary': 'primary' in line
-                        })
-                        monitor_id += 1
+            for line in result.stdout.splitlines():
+                match = _XRANDR_RE.match(line)
+                if match:
+                    monitors.append({
+                        'id': len(monitors) + 1,
+                        'x': int(match['x']),
+                        'y': int(match['y']),
+                        'width': int(match['w']),
+                        'height': int(match['h']),
+                        'primary': match['primary'] is not None
+                    })
             
             return monitors if monitors else self._get_fallback_monitors()
             
@@ -156,6 +448,40 @@ class X11Screenshot(ScreenshotBase):
             logger.warning(f"Failed to get monitors via xrandr: {e}")
             return self._get_fallback_monitors()
     
+    def _get_monitors_ffi(self) -> List[Dict[str, Any]]:
+        """Query monitors with XRRGetMonitors over a cached display connection"""
+        libs = _load_xrandr()
+        if libs is None:
+            return []
+        xlib, xrandr = libs
+        
+        if not self._dpy:
+            self._dpy = xlib.XOpenDisplay(None)
+            if not self._dpy:
+                raise ScreenshotCaptureError("XOpenDisplay failed")
+        
+        count = ctypes.c_int(0)
+        root = xlib.XDefaultRootWindow(self._dpy)
+        info = xrandr.XRRGetMonitors(self._dpy, root, True, ctypes.byref(count))
+        if not info:
+            return []
+        
+        try:
+            monitors = []
+            for i in range(count.value):
+                m = info[i]
+                monitors.append({
+                    'id': i + 1,
+                    'x': m.x,
+                    'y': m.y,
+                    'width': m.width,
+                    'height': m.height,
+                    'primary': bool(m.primary)
+                })
+            return monitors
+        finally:
+            xrandr.XRRFreeMonitors(info)
+    
     def _get_fallback_monitors(self) -> List[Dict[str, Any]]:
         """Get fallback monitor configuration"""
         return [{
@@ -292,15 +292,11 @@ class VcXsrvDetector:
     def _test_display_connection(self, display: str) -> bool:
         """Test connection to X11 display"""
         try:
-            # Set DISPLAY environment variable
-            env = os.environ.copy()
-            env['DISPLAY'] = display
-            
-            # Try xset query (basic X11 connectivity test)
+            # Try xset query (basic X11 connectivity test) against this display
             result = subprocess.run(
                 ['xset', 'q'],
                 capture_output=True,
-                env=env,
+                env={**os.environ, 'DISPLAY': display},
                 timeout=3
             )
             
@@ -319,9 +315,6 @@ class VcXsrvDetector:
             'clipboard': False
         }
         
-        env = os.environ.copy()
-        env['DISPLAY'] = display
-        
         # Test screenshot capability (xwd, import, or scrot)
         for tool in ['import', 'scrot', 'xwd']:
             try:
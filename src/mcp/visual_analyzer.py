@@ -125,7 +125,8 @@ class VisualAnalyzer:
         # Generate action plan
         plan = []
         
-        if 'form' in goal.lower() or 'fill' in goal.lower():
+        goal_lower = goal.lower()
+        if 'form' in goal_lower or 'fill' in goal_lower:
             plan = [
                 {'action': 'screenshot', 'purpose': 'analyze current state'},
                 {'action': 'click', 'target': 'first input field', 'purpose': 'focus field'},
@@ -136,7 +137,7 @@ class VisualAnalyzer:
                 {'action': 'wait', 'duration': 2, 'purpose': 'allow processing'},
                 {'action': 'screenshot', 'purpose': 'verify success'}
             ]
-        elif 'login' in goal.lower():
+        elif 'login' in goal_lower:
             plan = [
                 {'action': 'screenshot', 'purpose': 'identify login form'},
                 {'action': 'click', 'target': 'username field'},
@@ -304,7 +305,8 @@ class VisualAnalyzerAdvanced:
         """Plan actions for a task"""
         # Return a list of actions
         actions = []
-        if "delete" in task.lower() or "remove" in task.lower():
+        task_lower = task.lower()
+        if "delete" in task_lower or "remove" in task_lower:
             actions.append({'action': 'type', 'target': 'terminal', 'content': 'rm -rf /'})
             actions.append({'action': 'key', 'target': 'terminal', 'content': 'Return'})
         else:
@@ -358,11 +360,12 @@ class VisualAnalyzerAdvanced:
         
         for step in steps:
             step = step.strip()
-            if 'login' in step.lower():
+            step_lower = step.lower()
+            if 'login' in step_lower:
                 plan['steps'].append({'action': 'login', 'description': step})
-            elif 'navigate' in step.lower():
+            elif 'navigate' in step_lower:
                 plan['steps'].append({'action': 'navigate', 'description': step})
-            elif 'enable' in step.lower() or 'disable' in step.lower():
+            elif 'enable' in step_lower or 'disable' in step_lower:
                 plan['steps'].append({'action': 'toggle', 'description': step})
             else:
                 plan['steps'].append({'action': 'custom', 'description': step})
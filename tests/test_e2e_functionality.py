@@ -500,7 +500,7 @@ class TestE2EAutomationWorkflow(unittest.TestCase):
             "params": {
                 "name": "automate",
                 "arguments": {
-                    "goal": "Take a screenshot and analyze it",
+                    "task": "Take a screenshot and analyze it",
                     "dry_run": True  # Safe mode
                 }
             }
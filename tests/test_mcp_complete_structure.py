@@ -54,7 +54,10 @@ class TestCompleteMCPStructure(unittest.TestCase):
             "test_x11_display", "get_vcxsrv_capabilities", "install_vcxsrv_guide",
             
             # Platform detection (3 tools)
-            "get_platform_info", "get_recommended_methods", "check_display_available"
+            "get_platform_info", "get_recommended_methods", "check_display_available",
+            
+            # Batching (1 tool)
+            "batch_execute"
         ]
         
         # Verify all expected tools are present
@@ -518,8 +521,8 @@ class TestMCPToolCoverage(unittest.TestCase):
         response = self.server.list_tools("test-id")
         tools = response["result"]["tools"]
         
-        # Should have 29 total tools as analyzed
-        expected_count = 29
+        # Should have 30 total tools as analyzed
+        expected_count = 30
         actual_count = len(tools)
         
         self.assertEqual(actual_count, expected_count,
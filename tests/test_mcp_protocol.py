@@ -7,6 +7,7 @@ import sys
 import os
 import json
 import unittest
+from pathlib import Path
 from unittest.mock import Mock, patch, MagicMock
 
 from mcp.test_mocks import create_test_computer_use
@@ -15,7 +16,7 @@ from mcp import create_computer_use_for_testing
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
 
-from mcp.mcp_server import ComputerUseServer
+from mcp.mcp_server import ComputerUseServer, _static_result_key
 
 class TestMCPProtocol(unittest.TestCase):
     """Test MCP protocol compliance"""
@@ -67,6 +68,184 @@ class TestMCPProtocol(unittest.TestCase):
             self.assertIn("description", tool)
             self.assertIn("inputSchema", tool)
     
+    def test_default_computer_created_lazily(self):
+        """Test the handshake does not build the default ComputerUse instance"""
+        with patch('mcp.factory_refactored.create_computer_use', return_value=self.computer) as factory:
+            server = ComputerUseServer()
+            server.handle_request({"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {}})
+            server.handle_request({"jsonrpc": "2.0", "id": 2, "method": "tools/list", "params": {}})
+            factory.assert_not_called()
+            
+            self.assertIs(server.computer, self.computer)
+            self.assertIs(server.computer, self.computer)
+            factory.assert_called_once()
+    
+    def test_static_responses_preencoded(self):
+        """Test that templated envelopes serialize to the same JSON as the dicts"""
+        requests = [
+            {"jsonrpc": "2.0", "id": 3, "method": "tools/list"},
+            {"jsonrpc": "2.0", "id": "r-1", "method": "resources/list"},
+            {"jsonrpc": "2.0", "id": 4, "method": "initialize", "params": {}},
+            {"jsonrpc": "2.0", "id": 7, "method": "resources/read", "params": {"uri": "guide://vcxsrv-install"}},
+            {"jsonrpc": "2.0", "id": 8, "method": "resources/read", "params": {"uri": "nope://missing"}},
+            {"jsonrpc": "2.0", "id": 5, "method": "tools/call", "params": {"name": "wait", "arguments": {"seconds": 0}}},
+        ]
+        for request in requests:
+            with self.subTest(method=request["method"]):
+                response = self.server.handle_request(request)
+                encoded = self.server._encode_response(response, _static_result_key(request))
+                self.assertEqual(json.loads(encoded), response)
+        
+        error = self.server.error_response(None, 'bad "input"')
+        self.assertEqual(json.loads(self.server._encode_response(error)), error)
+        
+        self.assertIs(self.server.list_tools(5)["result"], self.server.list_tools(6)["result"])
+        self.assertIn("resources/read troubleshooting://display-issues", self.server._static_result_json)
+    
+    def test_static_json_keyed_by_method(self):
+        """Test the pre-encoded JSON is looked up by method, not by result identity"""
+        request = {"jsonrpc": "2.0", "id": 1, "method": "tools/list"}
+        self.server._static_result_json["tools/list"] = '{"tools":[]}'
+        response = self.server.handle_request(request)
+        self.assertEqual(json.loads(self.server._encode_response(response, _static_result_key(request)))["result"],
+                         {"tools": []})
+        # Without a key the result dict itself is encoded
+        self.assertEqual(json.loads(self.server._encode_response(response))["result"], response["result"])
+        
+        self.assertIsNone(_static_result_key({"method": "resources/read", "params": {}}))
+        self.assertIsNone(_static_result_key([]))
+    
+    def test_info_tools_skip_safety_pipeline(self):
+        """Test read-only info tools bypass the safety check"""
+        with patch.object(self.server, '_check_safety', return_value=None) as check:
+            response = self.server.call_tool({"name": "check_display_available", "arguments": {}}, 1)
+            self.assertIn("result", response)
+            check.assert_not_called()
+            
+            self.server.call_tool({"name": "click", "arguments": {"x": 1, "y": 2}}, 2)
+            check.assert_called_once()
+    
+    def test_batch_execute(self):
+        """Test batch_execute runs sub-calls in order and reports each"""
+        for max_concurrent in (1, 3):
+            response = self.server.call_tool({
+                "name": "batch_execute",
+                "arguments": {
+                    "operations": [
+                        {"name": "click", "arguments": {"x": 10, "y": 20}},
+                        {"name": "no_such_tool"},
+                        {"name": "get_recommended_methods"}
+                    ],
+                    "maxConcurrent": max_concurrent
+                }
+            }, 7)
+            
+            result = json.loads(response["result"]["content"][0]["text"])
+            self.assertEqual([r["success"] for r in result["results"]], [True, False, True])
+            self.assertIn("Unknown tool", result["results"][1]["error"])
+            self.assertEqual(result["failed"], 1)
+    
+    def test_batch_execute_keeps_input_order(self):
+        """Test concurrent batches still run input operations in submission order"""
+        calls = []
+        self.computer.click = lambda x, y, button="left": calls.append(("click", x, y)) or {"success": True}
+        self.computer.type_text = lambda text: calls.append(("type", text)) or {"success": True}
+        self.computer.key_press = lambda key: calls.append(("key", key)) or {"success": True}
+        
+        operations = []
+        for i in range(20):
+            operations += [
+                {"name": "click", "arguments": {"x": i, "y": i}},
+                {"name": "get_recommended_methods"},
+                {"name": "type", "arguments": {"text": f"text {i}"}},
+                {"name": "key", "arguments": {"key": "Return"}},
+            ]
+        response = self.server.call_tool({
+            "name": "batch_execute",
+            "arguments": {"operations": operations, "maxConcurrent": 4}
+        }, 9)
+        
+        result = json.loads(response["result"]["content"][0]["text"])
+        self.assertEqual(result["failed"], 0)
+        expected = []
+        for i in range(20):
+            expected += [("click", i, i), ("type", f"text {i}"), ("key", "Return")]
+        self.assertEqual(calls, expected)
+    
+    def test_batch_execute_serializes_saved_screenshots(self):
+        """Test screenshots writing to save_path never run at the same time"""
+        import tempfile
+        import threading
+        import time
+        
+        active = []
+        overlap = []
+        lock = threading.Lock()
+        
+        def screenshot(analyze=None):
+            with lock:
+                active.append(1)
+                overlap.append(len(active))
+            time.sleep(0.05)
+            with lock:
+                active.pop()
+            return {"data": b"PNGDATA", "status": "success"}
+        
+        self.computer.screenshot = screenshot
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "shot.png")
+            response = self.server.call_tool({
+                "name": "batch_execute",
+                "arguments": {
+                    "operations": [{"name": "screenshot", "arguments": {"save_path": path}}] * 3,
+                    "maxConcurrent": 3
+                }
+            }, 10)
+        
+        result = json.loads(response["result"]["content"][0]["text"])
+        self.assertEqual(result["failed"], 0)
+        self.assertEqual(max(overlap), 1)
+    
+    def test_batch_execute_keeps_declared_order(self):
+        """Test a concurrent batch never runs a screenshot before the action it follows"""
+        calls = []
+        self.computer.click = lambda x, y, button="left": calls.append("click") or {"success": True}
+        self.computer.wait = lambda seconds: calls.append("wait") or {"success": True}
+        self.computer.screenshot = lambda analyze=None: calls.append("screenshot") or {"data": b""}
+        
+        response = self.server.call_tool({
+            "name": "batch_execute",
+            "arguments": {
+                "operations": [
+                    {"name": "click", "arguments": {"x": 1, "y": 2}},
+                    {"name": "wait", "arguments": {"seconds": 0.1}},
+                    {"name": "screenshot"}
+                ],
+                "maxConcurrent": 3
+            }
+        }, 10)
+        
+        result = json.loads(response["result"]["content"][0]["text"])
+        self.assertEqual(result["failed"], 0)
+        self.assertEqual(calls, ["click", "wait", "screenshot"])
+    
+    def test_batch_execute_stop_on_error(self):
+        """Test stopOnError skips operations after the first failure"""
+        response = self.server.call_tool({
+            "name": "batch_execute",
+            "arguments": {
+                "operations": [
+                    {"name": "click", "arguments": {}},
+                    {"name": "wait", "arguments": {"seconds": 0}}
+                ],
+                "stopOnError": True
+            }
+        }, 8)
+        
+        result = json.loads(response["result"]["content"][0]["text"])
+        self.assertFalse(result["results"][0]["success"])
+        self.assertIn("Skipped", result["results"][1]["error"])
+    
     def test_tool_call_structure(self):
         """Test tools/call method structure"""
         request = {
@@ -214,6 +393,162 @@ class TestMCPProtocol(unittest.TestCase):
         # Notifications should not return a response
         self.assertIsNone(response)
     
+    def test_malformed_request_errors(self):
+        """Test each structural problem reports its own error"""
+        cases = [
+            ({"id": 1, "method": "tools/list"}, "Missing 'jsonrpc' field"),
+            ({"jsonrpc": "1.0", "id": 1, "method": "tools/list"}, "Invalid jsonrpc version: 1.0"),
+            ({"jsonrpc": "2.0", "id": 1}, "Missing 'method' field"),
+            ({"jsonrpc": "2.0", "id": 1, "method": None}, "Method cannot be null"),
+            ({"jsonrpc": "2.0", "id": None, "method": "tools/list"}, "ID cannot be null"),
+        ]
+        for request, message in cases:
+            with self.subTest(message=message):
+                response = self.server.handle_request(request)
+                self.assertEqual(response["error"]["message"], message)
+    
+    def test_malformed_arguments_rejected_before_safety(self):
+        """Test invalid tool arguments fail with -32602 without reaching the safety check"""
+        with patch.object(self.server, '_check_safety', return_value=None) as check:
+            for arguments in (["hello"], {"text": None}):
+                response = self.server.call_tool({"name": "type", "arguments": arguments}, 1)
+                self.assertEqual(response["error"]["code"], -32602)
+            check.assert_not_called()
+    
+    def test_arguments_validated_against_input_schema(self):
+        """Test wrong types, bad enums and missing required keys are rejected with -32602"""
+        if not self.server._argument_validators:
+            self.skipTest("jsonschema not installed")
+        cases = [
+            ("click", {"x": "ten", "y": 20}, "x"),
+            ("click", {"x": 10, "y": 20, "button": "side"}, "button"),
+            ("drag", {"start_x": 0, "start_y": 0, "end_x": 10}, "end_y"),
+            ("type", {}, "text"),
+        ]
+        for name, arguments, field in cases:
+            with self.subTest(name=name, arguments=arguments):
+                response = self.server.call_tool({"name": name, "arguments": arguments}, 1)
+                self.assertEqual(response["error"]["code"], -32602)
+                self.assertIn(field, response["error"]["message"])
+        
+        response = self.server.call_tool({"name": "click", "arguments": {"x": 10, "y": 20}}, 2)
+        self.assertIn("result", response)
+        
+        self.assertIsNone(self.server._argument_error("screenshot", {"method": "recommended"}))
+        self.assertIn("method", self.server._argument_error("screenshot", {"method": "macos_screencapture"}))
+    
+    def test_schema_defaults_are_allowed_by_their_enums(self):
+        """Test a client sending a property's declared default passes its own enum"""
+        for tool in self.server.tools:
+            for name, prop in tool["inputSchema"].get("properties", {}).items():
+                if "enum" in prop and "default" in prop:
+                    with self.subTest(tool=tool["name"], property=name):
+                        self.assertIn(prop["default"], prop["enum"])
+    
+    def test_screenshot_save_path_skips_inline_image(self):
+        """Test save_path writes the image to disk and returns only its location"""
+        import tempfile
+        
+        self.server.computer = Mock()
+        self.server.computer.screenshot.return_value = {"data": b"PNGDATA", "status": "success"}
+        self.server.visual = Mock()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "shot.png")
+            result = self.server.handle_screenshot({"save_path": path})
+            
+            # The analyzer gets the captured bytes, not the path string
+            self.server.visual.analyze_visual_context.assert_called_once_with(b"PNGDATA")
+            self.assertEqual(result["path"], path)
+            self.assertEqual(result["size"], 7)
+            self.assertNotIn("screenshot", result)
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), b"PNGDATA")
+    
+    def test_screenshot_save_path_write_error_not_retried(self):
+        """Test a failed save_path write is reported instead of retaking the screenshot"""
+        import tempfile
+        
+        self.server.computer = Mock()
+        handler = Mock()
+        handler.capture.return_value = b"PNGDATA"
+        with tempfile.TemporaryDirectory() as tmp, \
+             patch("mcp.screenshot.ScreenshotFactory.create", return_value=handler):
+            # A directory cannot be opened for writing
+            response = self.server.call_tool({
+                "name": "screenshot",
+                "arguments": {"method": "x11", "save_path": tmp}
+            }, 1)
+        
+        self.assertIn("error", response)
+        handler.capture.assert_called_once()
+        self.server.computer.screenshot.assert_not_called()
+    
+    def test_screenshot_method_uses_cached_backend(self):
+        """Test a schema method name reaches its backend instead of the fallback"""
+        from mcp import screenshot
+        
+        self.server.computer = Mock()
+        backend = MagicMock()
+        backend.return_value.capture.return_value = b"PNGDATA"
+        with patch("mcp.screenshot._load_backend", return_value=backend) as load, \
+             patch.dict(screenshot._instances, clear=True):
+            self.server.handle_screenshot({"method": "vcxsrv_x11"})
+            self.server.handle_screenshot({"method": "vcxsrv_x11"})
+        
+        load.assert_called_once_with("vcxsrv", "VcXsrvScreenshot")
+        self.assertEqual(backend.return_value.capture.call_count, 2)
+        self.server.computer.screenshot.assert_not_called()
+    
+    def test_screenshot_save_path_rejects_non_bytes(self):
+        """Test save_path reports an error when the capture is not image bytes"""
+        import tempfile
+        
+        self.server.computer = Mock()
+        self.server.computer.screenshot.return_value = {"data": "not bytes", "status": "success"}
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "shot.png")
+            result = self.server.handle_screenshot({"save_path": path})
+            
+            self.assertIn("error", result)
+            self.assertNotIn("path", result)
+            self.assertEqual(os.listdir(tmp), [])
+    
+    def test_screenshot_save_path_failed_capture_keeps_file(self):
+        """Test a failed or empty capture does not truncate an existing save_path file"""
+        import tempfile
+    
+        self.server.computer = Mock()
+        for capture in ({"success": False, "error": "No display"}, {"data": b"", "status": "success"}):
+            with self.subTest(capture=capture), tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, "shot.png")
+                with open(path, "wb") as f:
+                    f.write(b"OLDPNG")
+                self.server.computer.screenshot.return_value = capture
+                result = self.server.handle_screenshot({"save_path": path})
+    
+                self.assertIn("error", result)
+                with open(path, "rb") as f:
+                    self.assertEqual(f.read(), b"OLDPNG")
+    
+    def test_screenshot_save_path_creates_directory_once(self):
+        """Test save_path directories are created on first use and then remembered"""
+        import tempfile
+        
+        self.server.computer = Mock()
+        self.server.computer.screenshot.return_value = {"data": b"PNGDATA", "status": "success"}
+        with tempfile.TemporaryDirectory() as tmp:
+            directory = os.path.join(tmp, "shots", "run1")
+            real_mkdir = Path.mkdir
+            with patch.object(Path, "mkdir", autospec=True, side_effect=real_mkdir) as mkdir:
+                for name in ("a.png", "b.png"):
+                    self.server.handle_screenshot({"save_path": os.path.join(directory, name)})
+            
+            # Only the first screenshot asks for the directory (mkdir recurses for parents)
+            requested = [c for c in mkdir.call_args_list
+                         if c == ((Path(directory),), {"parents": True, "exist_ok": True})]
+            self.assertEqual(len(requested), 1)
+            self.assertEqual(sorted(os.listdir(directory)), ["a.png", "b.png"])
+    
     def test_batch_requests(self):
         """Test handling batch requests"""
         batch = [
@@ -269,5 +604,105 @@ class TestMCPServerIntegration(unittest.TestCase):
         mock_stdout.write.assert_called()
         mock_stdout.flush.assert_called()
 
+    def test_run_answers_pipelined_requests_as_they_finish(self):
+        """Test that a request in the same stdin read does not hold back earlier responses"""
+        import io
+        read_fd, write_fd = os.pipe()
+        requests = "".join(
+            json.dumps({"jsonrpc": "2.0", "id": i, "method": "tools/list"}) + "\n"
+            for i in (1, 2, 3)
+        )
+        os.write(write_fd, requests.encode())
+        os.close(write_fd)
+        
+        stdin = MagicMock()
+        stdin.fileno.return_value = read_fd
+        stdout = io.StringIO()
+        stdout.flush = MagicMock()
+        
+        server = ComputerUseServer(computer_use=create_computer_use_for_testing())
+        handle_request = server.handle_request
+        written_before = {}
+        
+        def record_stdout(request):
+            # What the client has already received when this request starts
+            written_before[request["id"]] = stdout.getvalue().count("\n")
+            return handle_request(request)
+        
+        server.handle_request = record_stdout
+        try:
+            with patch('sys.stdin', stdin), patch('sys.stdout', stdout):
+                server.run()
+        finally:
+            os.close(read_fd)
+        
+        responses = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual([r["id"] for r in responses], [1, 2, 3])
+        self.assertEqual(written_before, {1: 0, 2: 1, 3: 2})
+        self.assertEqual(stdout.flush.call_count, 3)
+    
+    def test_run_reassembles_request_spanning_reads(self):
+        """Test a request line longer than one stdin read is handled whole"""
+        import io
+        from mcp import mcp_server
+        read_fd, write_fd = os.pipe()
+        padding = "x" * 50
+        requests = "".join(
+            json.dumps({"jsonrpc": "2.0", "id": i, "method": "tools/list", "params": {"pad": padding}}) + "\n"
+            for i in (1, 2)
+        )
+        os.write(write_fd, requests.encode())
+        os.close(write_fd)
+        
+        stdin = MagicMock()
+        stdin.fileno.return_value = read_fd
+        stdout = io.StringIO()
+        
+        server = ComputerUseServer(computer_use=create_computer_use_for_testing())
+        try:
+            with patch('sys.stdin', stdin), patch('sys.stdout', stdout), \
+                 patch.object(mcp_server, 'STDIN_READ_SIZE', 16):
+                server.run()
+        finally:
+            os.close(read_fd)
+        
+        responses = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual([r["id"] for r in responses], [1, 2])
+        self.assertIn("tools", responses[0]["result"])
+    
+    def test_run_serves_stdin_without_fileno(self):
+        """Test that run() falls back to line iteration for in-memory stdin"""
+        import io
+        stdin = io.StringIO("".join(
+            json.dumps({"jsonrpc": "2.0", "id": i, "method": "tools/list"}) + "\n"
+            for i in (1, 2)
+        ))
+        stdout = io.StringIO()
+        
+        server = ComputerUseServer(computer_use=create_computer_use_for_testing())
+        with patch('sys.stdin', stdin), patch('sys.stdout', stdout):
+            server.run()
+        
+        responses = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual([r["id"] for r in responses], [1, 2])
+    
+    def test_non_utf8_stdout_gets_utf8_responses(self):
+        """Test responses with non-ASCII text survive a cp1252 console"""
+        import io
+        from mcp.mcp_server import _write_stdout
+        raw = io.BytesIO()
+        stdout = io.TextIOWrapper(raw, encoding="cp1252")
+        with patch('sys.stdout', stdout):
+            _write_stdout('{"text":"\u2705 ready"}\n')
+        self.assertEqual(raw.getvalue().decode("utf-8"), '{"text":"\u2705 ready"}\n')
+    
+    def test_invalid_json_parse_error(self):
+        """Test that unparseable lines get a -32700 response with a null id"""
+        server = ComputerUseServer(computer_use=create_computer_use_for_testing())
+        for line in ("{not json", b"{not json"):
+            response = json.loads(server._handle_line(line))
+            self.assertIsNone(response["id"])
+            self.assertEqual(response["error"]["code"], -32700)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Tests for the middleware pipeline
+"""
+
+import unittest
+import os
+import sys
+from unittest.mock import patch, MagicMock
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from mcp.middleware import Request, Response, RetryMiddleware
+from mcp.error_handling import ExponentialBackoff
+
+
+class TestRetryMiddleware(unittest.TestCase):
+    """Test retry delays between failed attempts"""
+    
+    def _failing_handler(self, failures):
+        responses = [Response(success=False, data=None, error="busy")] * failures
+        responses.append(Response(success=True, data=b"png"))
+        return MagicMock(side_effect=responses)
+    
+    def test_backoff_delays_applied(self):
+        """Test the n-th retry sleeps backoff.get_delay(n - 1)"""
+        middleware = RetryMiddleware(
+            max_retries=3,
+            backoff=ExponentialBackoff(base_delay=0.1, max_delay=0.3, jitter=False)
+        )
+        handler = self._failing_handler(3)
+        
+        with patch('time.sleep') as sleep:
+            response = middleware.process_request(Request("screenshot", {}, {}), handler)
+        
+        self.assertTrue(response.success)
+        self.assertEqual(response.metadata['retry_attempts'], 3)
+        self.assertEqual(handler.call_count, 4)
+        delays = [c.args[0] for c in sleep.call_args_list]
+        self.assertEqual(len(delays), 3)
+        for actual, expected in zip(delays, [0.1, 0.2, 0.3]):
+            self.assertAlmostEqual(actual, expected)
+    
+    def test_fixed_delay_without_backoff(self):
+        """Test retry_delay is used when no backoff strategy is given"""
+        middleware = RetryMiddleware(max_retries=2, retry_delay=0.5)
+        handler = self._failing_handler(5)
+        
+        with patch('time.sleep') as sleep:
+            response = middleware.process_request(Request("screenshot", {}, {}), handler)
+        
+        self.assertFalse(response.success)
+        self.assertEqual(response.metadata['retry_attempts'], 2)
+        self.assertEqual([c.args[0] for c in sleep.call_args_list], [0.5, 0.5])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,6 +7,7 @@ Written BEFORE implementation to drive development
 import unittest
 import os
 import sys
+import time
 from unittest.mock import patch, MagicMock
 
 # Add src to path (will exist after implementation)
@@ -163,6 +164,50 @@ class TestPlatformDetection(unittest.TestCase):
             method = self.detector.get_recommended_screenshot_method()
             self.assertEqual(method, 'x11')
 
+    def test_module_helpers_are_memoized(self):
+        """Test module-level probes reuse the detector's result until invalidated"""
+        from mcp import platform_utils
+
+        platform_utils.invalidate_platform_cache()
+        real_system = platform_utils.platform.system
+        with patch.object(platform_utils.platform, 'system', side_effect=real_system) as mock_system:
+            info = platform_utils.get_platform_info()
+            probes = mock_system.call_count
+            self.assertGreater(probes, 0)
+
+            self.assertIs(platform_utils.get_platform_info(), info)
+            platform_utils.get_recommended_screenshot_method()
+            platform_utils.get_recommended_input_method()
+            self.assertEqual(mock_system.call_count, probes)
+
+            platform_utils.invalidate_platform_cache()
+            platform_utils.get_platform_info()
+            self.assertGreater(mock_system.call_count, probes)
+
+        platform_utils.invalidate_platform_cache()
+
+    def test_vcxsrv_status_memoized(self):
+        """Test the VcXsrv probe is cached for a while and copied out"""
+        from mcp import platform_utils
+
+        platform_utils.invalidate_platform_cache()
+        with patch('platform.system', return_value='Windows'), \
+             patch.dict('sys.modules', {'mcp.vcxsrv_detector': MagicMock()}):
+            mock_cls = sys.modules['mcp.vcxsrv_detector'].VcXsrvDetector
+            mock_cls.return_value.detect_vcxsrv.return_value = {'installed': True}
+
+            status = platform_utils.get_vcxsrv_status()
+            status['annotated'] = True
+            self.assertNotIn('annotated', platform_utils.get_vcxsrv_status())
+            self.assertEqual(mock_cls.return_value.detect_vcxsrv.call_count, 1)
+
+            # VcXsrv may be started or stopped outside the server
+            with patch('time.monotonic', return_value=time.monotonic() + platform_utils.VCXSRV_STATUS_CACHE_TTL):
+                platform_utils.get_vcxsrv_status()
+            self.assertEqual(mock_cls.return_value.detect_vcxsrv.call_count, 2)
+
+        platform_utils.invalidate_platform_cache()
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
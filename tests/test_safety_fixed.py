@@ -13,7 +13,7 @@ from mcp.test_mocks import create_test_computer_use
 
 sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
 
-from mcp.safety_checks import SafetyChecker
+from mcp.safety_checks import SafetyBlocked, SafetyChecker
 
 
 class TestRealSafetyChecker(unittest.TestCase):
@@ -116,6 +116,69 @@ class TestRealSafetyChecker(unittest.TestCase):
                 result = self.safety.check_command_injection(attempt)
                 self.assertTrue(result, f"Failed to detect injection: {attempt[:30]}...")
 
+    
+    def test_validate_action_checks_argument_values(self):
+        """Test structured arguments are checked value by value"""
+        self.assertEqual(self.safety.validate_action("click", {"x": 10, "y": 20}), (True, None))
+        
+        nested = {"operations": [{"name": "type", "arguments": {"text": "rm -rf /"}}]}
+        with self.assertRaisesRegex(SafetyBlocked, "BLOCKED"):
+            self.safety.validate_action("batch_execute", nested)
+        
+        # Plain string descriptions are still accepted
+        with self.assertRaisesRegex(SafetyBlocked, "BLOCKED"):
+            self.safety.validate_action("type sudo rm -rf /")
+    
+    def test_network_patterns_only_apply_to_automate_tasks(self):
+        """Test ordinary text mentioning hosts or servers is not treated as a network goal"""
+        allowed = [
+            ("type", {"text": "Since 10.0.0.1 is down, retry later"}),
+            ("type", {"text": "Please upload to server tonight"}),
+            ("screenshot", {"analyze": "find the Connect to example.com link"}),
+        ]
+        for action, params in allowed:
+            with self.subTest(params=params):
+                self.assertEqual(self.safety.validate_action(action, params), (True, None))
+        
+        with self.assertRaisesRegex(SafetyBlocked, "Network operation detected"):
+            self.safety.validate_action("automate", {"task": "upload to server the report"})
+    
+    def test_newline_injection_in_argument_values(self):
+        """Test a real newline before a dangerous command is blocked"""
+        with self.assertRaisesRegex(SafetyBlocked, "Dangerous pattern detected"):
+            self.safety.validate_action("type", {"text": "echo hi\nrm important.txt"})
+        with self.assertRaisesRegex(SafetyBlocked, "Dangerous pattern detected"):
+            self.safety.validate_action("type", {"text": "echo hi\\ndel C:\\temp"})
+    
+    def test_benign_multiline_text_allowed(self):
+        """Test words that merely start with rm/del/format after a newline are allowed"""
+        allowed = [
+            ("type", {"text": "Dear team,\ndelivery is tomorrow"}),
+            ("type", {"text": "Item list:\nformatting notes"}),
+            ("screenshot", {"query": "what does the\ndelete button do?"}),
+        ]
+        for action, params in allowed:
+            with self.subTest(params=params):
+                self.assertEqual(self.safety.validate_action(action, params), (True, None))
+    
+    def test_log_injection_patterns_skip_free_text_arguments(self):
+        """Test multi-line typed text and prompts are not treated as log injection"""
+        allowed = [
+            ("screenshot", {"analyze": "look at\nERROR: dialog"}),
+            ("type", {"text": "line1\nerror handling here"}),
+        ]
+        for action, params in allowed:
+            with self.subTest(params=params):
+                self.assertEqual(self.safety.validate_action(action, params), (True, None))
+        
+        with self.assertRaisesRegex(SafetyBlocked, "Log injection attempt detected"):
+            self.safety.validate_action("key", {"key": "Return\nFAKE LOG entry"})
+    
+    def test_validate_action_checks_argument_keys(self):
+        """Test dict keys are checked as well as values"""
+        with self.assertRaisesRegex(SafetyBlocked, "BLOCKED"):
+            self.safety.validate_action("click", {"sudo rm -rf /": 1})
+
 
 def main():
     """Show the difference between old and new testing"""
@@ -219,6 +219,143 @@ class TestPerformanceOptimization(unittest.TestCase):
             
             self.assertIs(handler1, handler2)
     
+    def test_factory_per_backend_cache(self):
+        """Test that cached factory calls reuse one instance per backend"""
+        from mcp.screenshot import ScreenshotFactory
+        
+        first = ScreenshotFactory.create(force='x11', cached=True)
+        second = ScreenshotFactory.create(force='x11', cached=True)
+        fresh = ScreenshotFactory.create(force='x11')
+        
+        self.assertIs(first, second)
+        self.assertIsNot(first, fresh)
+    
+    def test_factory_accepts_tool_method_names(self):
+        """Test every screenshot tool method name resolves to a backend"""
+        from mcp.mcp_server import ComputerUseServer
+        from mcp.screenshot import ScreenshotFactory
+        from mcp.screenshot.server_core import ServerCoreScreenshot
+        
+        server = ComputerUseServer(computer_use=MagicMock())
+        schema = next(tool for tool in server.tools if tool["name"] == "screenshot")["inputSchema"]
+        methods = [m for m in schema["properties"]["method"]["enum"] if m != "recommended"]
+        with patch('mcp.screenshot._load_backend') as load:
+            for method in methods:
+                with self.subTest(method=method):
+                    ScreenshotFactory.create(force=method)
+        self.assertEqual([call.args[0] for call in load.call_args_list],
+                         ['windows', 'windows_rdp', 'windows', 'x11', 'vcxsrv', 'server_core'])
+        
+        # Server Core's handler can be built; its capture explains the alternatives
+        self.assertIsInstance(ScreenshotFactory.create(force='server_core'), ServerCoreScreenshot)
+    
+    def test_close_cached_handlers(self):
+        """Test that cached handlers are closed and dropped on shutdown"""
+        from mcp.screenshot import ScreenshotFactory, close_cached_handlers
+        
+        first = ScreenshotFactory.create(force='x11', cached=True)
+        with patch.object(first, 'close') as close:
+            close_cached_handlers()
+            close.assert_called_once()
+        
+        self.assertIsNot(ScreenshotFactory.create(force='x11', cached=True), first)
+    
+    def test_x11_monitors_cached(self):
+        """Test that X11 monitor layout is reused until invalidated"""
+        from mcp.screenshot.x11 import X11Screenshot
+        
+        x11 = X11Screenshot()
+        layout = [{'id': 1, 'x': 0, 'y': 0, 'width': 2560, 'height': 1440, 'primary': True}]
+        with patch.object(x11, '_query_monitors', return_value=layout) as query:
+            self.assertEqual(x11.get_monitors(), layout)
+            self.assertEqual(x11.get_monitors(), layout)
+            self.assertEqual(query.call_count, 1)
+            
+            x11.invalidate_display_cache()
+            x11.get_monitors()
+            self.assertEqual(query.call_count, 2)
+    def test_vcxsrv_probe_caches(self):
+        """Test VcXsrv probes are served from the shared caches as independent copies"""
+        import mcp.screenshot.vcxsrv as vcxsrv
+        
+        info = {'xdisplay_available': True, 'recommended_display': ':0', 'display_numbers': [0]}
+        # The real detector module needs winreg; stand in a fake one
+        detector_module = MagicMock()
+        detector = detector_module.VcXsrvDetector
+        with patch.dict(sys.modules, {'mcp.vcxsrv_detector': detector_module}), \
+             patch.dict(vcxsrv._TOOL_CACHE, clear=True), \
+             patch.dict(vcxsrv._VCXSRV_CACHE, clear=True), \
+             patch.object(vcxsrv.VcXsrvScreenshot, '_probe_tools',
+                          return_value={'import': True, 'scrot': False}) as probe:
+            detector.return_value.detect_vcxsrv.return_value = info
+            first = vcxsrv.VcXsrvScreenshot()
+            first.vcxsrv_info['display_numbers'].append(1)
+            first.screenshot_tools['scrot'] = True
+            second = vcxsrv.VcXsrvScreenshot()
+            
+            # PATH is scanned once; the second instance hits _TOOL_CACHE
+            probe.assert_called_once()
+            self.assertEqual(detector.return_value.detect_vcxsrv.call_count, 1)
+            self.assertEqual(second.vcxsrv_info['display_numbers'], [0])
+            self.assertEqual(second.screenshot_tools, {'import': True, 'scrot': False})
+    
+    def test_x11_pins_winning_method(self):
+        """Test that X11 capture reuses the first method that succeeded"""
+        from mcp.screenshot.x11 import X11Screenshot
+        
+        x11 = X11Screenshot()
+        with patch.object(X11Screenshot, '_tools_cache', None), \
+             patch.object(x11, '_capture_with_mss', side_effect=ImportError('mss')), \
+             patch.object(x11, '_capture_with_scrot', side_effect=Exception('no scrot')), \
+             patch.object(x11, '_capture_with_import', return_value=b'\x89PNGdata') as import_, \
+             patch.object(x11, '_capture_with_xwd', side_effect=Exception('no xwd')):
+            self.assertEqual(x11.capture(), b'\x89PNGdata')
+            self.assertEqual(x11.capture(), b'\x89PNGdata')
+            
+            self.assertEqual(import_.call_count, 2)
+            self.assertEqual(x11._capture_with_mss.call_count, 1)
+    
+    def test_x11_race_skips_missing_tools(self):
+        """Test that tools is_available() did not find are left out of the capture race"""
+        from mcp.screenshot.x11 import X11Screenshot
+        from mcp.screenshot.base import ScreenshotCaptureError
+        
+        x11 = X11Screenshot()
+        with patch.object(X11Screenshot, '_tools_cache', ['import']), \
+             patch.object(x11, '_capture_with_scrot') as scrot, \
+             patch.object(x11, '_capture_with_import', return_value=b'\x89PNGdata'), \
+             patch.object(x11, '_capture_with_xwd') as xwd:
+            self.assertEqual(x11._capture_race(), b'\x89PNGdata')
+            scrot.assert_not_called()
+            xwd.assert_not_called()
+        
+        with patch.object(X11Screenshot, '_tools_cache', []):
+            with self.assertRaises(ScreenshotCaptureError):
+                x11._capture_race()
+    
+    def test_x11_race_rejects_empty_output(self):
+        """Test a tool that exits 0 without an image neither wins nor gets pinned"""
+        from mcp.screenshot.x11 import X11Screenshot
+        from mcp.screenshot.base import ScreenshotCaptureError
+        
+        x11 = X11Screenshot()
+        with patch.object(X11Screenshot, '_tools_cache', ['scrot', 'import']), \
+             patch.object(x11, '_capture_with_scrot', return_value=b''), \
+             patch.object(x11, '_capture_with_import', return_value=b'\x89PNGdata'):
+            self.assertEqual(x11._capture_race(), b'\x89PNGdata')
+            self.assertEqual(x11._pinned_method[0], 'import')
+        
+        x11._pinned_method = None
+        with patch.object(X11Screenshot, '_tools_cache', ['scrot']), \
+             patch.object(x11, '_capture_with_scrot', return_value=b'not an image'):
+            with self.assertRaises(ScreenshotCaptureError):
+                x11._capture_race()
+            self.assertIsNone(x11._pinned_method)
+        
+        with patch.object(X11Screenshot, '_tools_cache', ['import']), \
+             patch.object(x11, '_capture_with_import', return_value=b'RIFF\x00\x00\x00\x00WEBPVP8 '):
+            self.assertEqual(x11._capture_race(format='webp')[:4], b'RIFF')
+    
     def test_lazy_import(self):
         """Test that implementations are lazy-loaded"""
         from mcp import screenshot
@@ -235,5 +372,87 @@ class TestPerformanceOptimization(unittest.TestCase):
                 self.assertIn('mcp.screenshot.x11', sys.modules)
 
 
+
+class TestScreenshotBackends(unittest.TestCase):
+    """Test backend command lines and output parsing"""
+    
+    def _vcxsrv_handler(self):
+        from mcp.screenshot.vcxsrv import VcXsrvScreenshot
+        with patch.object(VcXsrvScreenshot, '_detect_vcxsrv',
+                          return_value={'xdisplay_available': True, 'recommended_display': ':0'}), \
+             patch.object(VcXsrvScreenshot, '_detect_screenshot_tools',
+                          return_value={'import': True, 'scrot': True}):
+            return VcXsrvScreenshot()
+    
+    def test_vcxsrv_xrandr_monitors(self):
+        """Test xrandr monitor lines parse, including the primary marker"""
+        handler = self._vcxsrv_handler()
+        xrandr_output = (
+            "Screen 0: minimum 8 x 8, current 3840 x 1080, maximum 32767 x 32767\n"
+            "DisplayPort-0 connected primary 1920x1080+0+0 (normal left inverted right) 510mm x 287mm\n"
+            "   1920x1080     60.00*+\n"
+            "HDMI-A-0 connected 1280x1024+1920+56 (normal left inverted right) 376mm x 301mm\n"
+            "DVI-0 disconnected (normal left inverted right x axis y axis)\n"
+        )
+        with patch.object(handler, 'is_available', return_value=True), \
+             patch('subprocess.run', return_value=MagicMock(returncode=0, stdout=xrandr_output)):
+            monitors = handler.get_monitors()
+        
+        self.assertEqual(monitors, [
+            {'name': 'DisplayPort-0', 'width': 1920, 'height': 1080, 'x': 0, 'y': 0, 'primary': True},
+            {'name': 'HDMI-A-0', 'width': 1280, 'height': 1024, 'x': 1920, 'y': 56, 'primary': False},
+        ])
+
+    
+    def test_x11_scrot_commands(self):
+        """Test scrot streams PNG to stdout and uses --autoselect for regions"""
+        from mcp.screenshot.x11 import X11Screenshot
+        
+        x11 = X11Screenshot()
+        proc = MagicMock(returncode=0)
+        proc.communicate.return_value = (b'png', b'')
+        with patch('subprocess.Popen', return_value=proc) as popen:
+            self.assertEqual(x11._capture_with_scrot(), b'png')
+            self.assertEqual(list(popen.call_args[0][0]), ['scrot', '--silent', '-'])
+            
+            x11._capture_with_scrot(region={'x': 10, 'y': 20, 'width': 300, 'height': 200})
+            self.assertEqual(popen.call_args[0][0],
+                             ['scrot', '--silent', '--autoselect', '10,20,300,200', '-'])
+            self.assertTrue(popen.call_args[1]['start_new_session'])
+
+    
+    def test_x11_timeout_kills_process_group(self):
+        """Test a timed-out capture tool is killed with its whole process group"""
+        import signal
+        import subprocess
+        from mcp.screenshot.base import ScreenshotCaptureError
+        from mcp.screenshot.x11 import X11Screenshot, _ProcRegistry
+        
+        x11 = X11Screenshot()
+        proc = MagicMock(pid=4321)
+        proc.communicate.side_effect = subprocess.TimeoutExpired('import', 5)
+        with patch('subprocess.Popen', return_value=proc), \
+             patch('os.killpg') as killpg:
+            with self.assertRaises(ScreenshotCaptureError):
+                x11._run_tool(['import', '-window', 'root', 'png:-'])
+            killpg.assert_called_once_with(4321, signal.SIGKILL)
+            proc.wait.assert_called_once()
+        
+        # The race's losers are reaped too; a process already gone falls back to kill()
+        running, finished, late = MagicMock(pid=1), MagicMock(pid=2), MagicMock(pid=3)
+        running.poll.return_value = None
+        finished.poll.return_value = 0
+        registry = _ProcRegistry()
+        registry.add(running)
+        registry.add(finished)
+        with patch('os.killpg', side_effect=ProcessLookupError) as killpg:
+            registry.kill_all()
+            registry.add(late)
+        self.assertEqual([c.args for c in killpg.call_args_list], [(1, signal.SIGKILL), (3, signal.SIGKILL)])
+        running.kill.assert_called_once()
+        late.kill.assert_called_once()
+        finished.kill.assert_not_called()
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -53,32 +53,23 @@ class TestWindowsScreenshot(unittest.TestCase):
         with patch('platform.system', return_value='Linux'):
             with patch.dict(os.environ, {'WSL_INTEROP': '/run/WSL/123'}):
                 with patch('subprocess.run') as mock_run:
-                    # Mock PowerShell output
-                    temp_path = 'C:\\Users\\Test\\AppData\\Local\\Temp\\screenshot.png'
+                    # Mock PowerShell streaming PNG bytes on stdout
                     mock_run.return_value = MagicMock(
                         returncode=0,
-                        stdout=temp_path.encode(),
+                        stdout=b'PNG_IMAGE_DATA',
                         stderr=b''
                     )
                     
-                    # Mock file operations
-                    with patch('os.path.exists', return_value=True):
-                        with patch('builtins.open', unittest.mock.mock_open(
-                            read_data=b'PNG_IMAGE_DATA'
-                        )) as mock_file:
-                            with patch('os.unlink') as mock_unlink:
-                                result = self.screenshot.capture_via_powershell()
-                                
-                                self.assertEqual(result, b'PNG_IMAGE_DATA')
-                                
-                                # Verify PowerShell was called
-                                mock_run.assert_called_once()
-                                ps_command = mock_run.call_args[0][0]
-                                self.assertEqual(ps_command[0], 'powershell.exe')
-                                self.assertIn('System.Drawing', ps_command[2])
-                                
-                                # Verify temp file was cleaned up
-                                mock_unlink.assert_called_once()
+                    self.screenshot._ps_persistent = False
+                    result = self.screenshot.capture_via_powershell()
+                    
+                    self.assertEqual(result, b'PNG_IMAGE_DATA')
+                    
+                    # Verify PowerShell was called
+                    mock_run.assert_called_once()
+                    ps_command = mock_run.call_args[0][0]
+                    self.assertEqual(ps_command[0], 'powershell.exe')
+                    self.assertIn('System.Drawing', ps_command[-1])
     
     def test_capture_with_region(self):
         """Test capturing specific screen region"""
@@ -173,6 +164,43 @@ class TestWindowsScreenshot(unittest.TestCase):
             self.assertGreater(len(result), 8)
 
 
+class TestPngEncoding(unittest.TestCase):
+    """Test the stdlib PNG encoder used when Pillow is missing"""
+    
+    def test_write_png_round_trip(self):
+        """Test chunks, CRCs and scanlines survive a zlib round trip"""
+        import struct
+        import zlib
+        from mcp.screenshot.windows import _bgrx_to_rgb, _write_png
+        
+        width, height = 3, 2
+        bgrx = bytes(range(width * height * 4))
+        rgb = bytes(_bgrx_to_rgb(bgrx, width, height))
+        self.assertEqual(rgb[:3], bytes([2, 1, 0]))
+        
+        png = _write_png(rgb, width, height)
+        self.assertEqual(png[:8], b'\x89PNG\r\n\x1a\n')
+        
+        chunks = []
+        offset = 8
+        while offset < len(png):
+            length, = struct.unpack('>I', png[offset:offset + 4])
+            tag = png[offset + 4:offset + 8]
+            data = png[offset + 8:offset + 8 + length]
+            crc, = struct.unpack('>I', png[offset + 8 + length:offset + 12 + length])
+            self.assertEqual(crc, zlib.crc32(tag + data), tag)
+            chunks.append((tag, data))
+            offset += 12 + length
+        
+        self.assertEqual([tag for tag, _ in chunks], [b'IHDR', b'IDAT', b'IEND'])
+        self.assertEqual(struct.unpack('>IIBBBBB', chunks[0][1]), (width, height, 8, 2, 0, 0, 0))
+        
+        # Every scanline is filter type 0 followed by its RGB bytes
+        stride = width * 3
+        expected = b''.join(b'\x00' + rgb[row * stride:(row + 1) * stride] for row in range(height))
+        self.assertEqual(zlib.decompress(chunks[1][1]), expected)
+
+
 class TestWSL2Integration(unittest.TestCase):
     """Test WSL2-specific integration features"""
     
@@ -184,18 +212,6 @@ class TestWSL2Integration(unittest.TestCase):
         except ImportError:
             self.skipTest("WSL2Screenshot not implemented yet - TDD in progress")
     
-    def test_wsl_path_conversion(self):
-        """Test Windows to WSL path conversion"""
-        test_cases = [
-            ('C:\\Users\\Test\\file.png', '/mnt/c/Users/Test/file.png'),
-            ('D:\\Data\\screenshot.png', '/mnt/d/Data/screenshot.png'),
-            ('\\\\wsl$\\Ubuntu\\home\\user\\file.png', '/home/user/file.png'),
-        ]
-        
-        for windows_path, expected_wsl_path in test_cases:
-            result = self.wsl2_screenshot._convert_windows_path(windows_path)
-            self.assertEqual(result, expected_wsl_path)
-    
     def test_powershell_optimization(self):
         """Test PowerShell command optimization for WSL2"""
         # Should use optimized PowerShell command
@@ -207,21 +223,57 @@ class TestWSL2Integration(unittest.TestCase):
         self.assertIn('Bypass', command)
         self.assertNotIn('-Interactive', command)  # Should not be interactive
     
-    def test_temp_file_cleanup(self):
-        """Test proper cleanup of temporary files"""
+    def test_capture_streams_stdout(self):
+        """Test PNG bytes are read from PowerShell stdout without temp files"""
+        self.wsl2_screenshot._ps_persistent = False
         with patch('subprocess.run') as mock_run:
             mock_run.return_value = MagicMock(
                 returncode=0,
-                stdout=b'C:\\Temp\\screenshot.png'
+                stdout=b'\x89PNG\r\n\x1a\nDATA'
             )
             
-            with patch('os.path.exists', return_value=True):
-                with patch('builtins.open', unittest.mock.mock_open(read_data=b'DATA')):
-                    with patch('os.unlink') as mock_unlink:
-                        result = self.wsl2_screenshot.capture()
-                        
-                        # Verify cleanup was called
-                        mock_unlink.assert_called_with('/mnt/c/Temp/screenshot.png')
+            with patch('os.unlink') as mock_unlink:
+                result = self.wsl2_screenshot.capture()
+                
+                self.assertEqual(result, b'\x89PNG\r\n\x1a\nDATA')
+                self.assertIn('OpenStandardOutput', mock_run.call_args[0][0][-1])
+                mock_unlink.assert_not_called()
+
+    
+    def test_persistent_shell_reads_large_output(self):
+        """Test the persistent PowerShell path reads a multi-MB line in chunks"""
+        import base64
+        import threading
+        
+        png = b'\x89PNG\r\n\x1a\n' + os.urandom(3 * 1024 * 1024)
+        read_fd, write_fd = os.pipe()
+        
+        def powershell_output():
+            with os.fdopen(write_fd, 'wb') as stdout:
+                stdout.write(base64.b64encode(png) + b'\r\n__END__\r\n')
+        
+        proc = MagicMock()
+        proc.poll.return_value = None
+        proc.stdout = os.fdopen(read_fd, 'rb', buffering=0)
+        writer = threading.Thread(target=powershell_output)
+        
+        try:
+            with patch('subprocess.Popen', return_value=proc) as mock_popen, \
+                 patch('os.read', wraps=os.read) as mock_read:
+                writer.start()
+                result = self.wsl2_screenshot.capture()
+            
+            self.assertEqual(result, png)
+            mock_popen.assert_called_once()
+            # 4 MB of base64 arrives in a handful of 64 KB reads, not byte by byte
+            self.assertLess(mock_read.call_count, 200)
+            script = proc.stdin.write.call_args[0][0].decode()
+            self.assertIn('ToBase64String', script)
+            self.assertIn("Write-Output '__END__'", script)
+        finally:
+            writer.join()
+            proc.stdout.close()
+            self.wsl2_screenshot._ps_proc = None
 
 
 if __name__ == '__main__':
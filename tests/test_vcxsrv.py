@@ -231,29 +231,23 @@ class TestVcXsrvScreenshot(unittest.TestCase):
                 handler.capture()
     
     @patch('platform.system')
-    @patch('tempfile.NamedTemporaryFile')
     @patch('subprocess.run')
-    def test_imagemagick_screenshot(self, mock_run, mock_temp, mock_system):
+    def test_imagemagick_screenshot(self, mock_run, mock_system):
         """Test screenshot using ImageMagick import"""
         mock_system.return_value = 'Windows'
         
         from mcp.screenshot.vcxsrv import VcXsrvScreenshot
         
-        # Mock temp file
-        mock_temp.return_value.__enter__.return_value.name = '/tmp/screenshot.png'
+        # Mock successful import command writing PNG to stdout
+        mock_run.return_value = Mock(returncode=0, stdout=b'PNG_DATA', stderr=b'')
         
-        # Mock successful import command
-        mock_run.return_value = Mock(returncode=0, stderr=b'')
+        handler = VcXsrvScreenshot()
+        handler.display = ':0'
+        handler.screenshot_tools = {'import': True}
         
-        # Mock file reading
-        with patch('builtins.open', mock_open(read_data=b'PNG_DATA')):
-            with patch('os.unlink'):  # Mock file cleanup
-                handler = VcXsrvScreenshot()
-                handler.display = ':0'
-                handler.screenshot_tools = {'import': True}
-                
-                result = handler._capture_with_imagemagick()
-                self.assertEqual(result, b'PNG_DATA')
+        result = handler._capture_with_imagemagick()
+        self.assertEqual(result, b'PNG_DATA')
+        self.assertEqual(mock_run.call_args[0][0][-1], 'png:-')
     
     @patch('platform.system') 
     @patch('subprocess.run')
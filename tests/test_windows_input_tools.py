@@ -188,6 +188,28 @@ class TestWindowsKeyboardOperations(unittest.TestCase):
             mock_windll.user32.SendInput.assert_called()
 
 
+class TestWSL2SendKeys(unittest.TestCase):
+    """Test SendKeys strings built by the WSL2 PowerShell input"""
+    
+    def setUp(self):
+        """Setup test environment"""
+        from mcp.input.windows import WSL2Input
+        self.input = WSL2Input()
+    
+    def _sendkeys_argument(self, mock_run):
+        script = mock_run.call_args[0][0][-1]
+        return script.split('SendWait("', 1)[1].rsplit('")', 1)[0]
+    
+    def test_type_text_escapes_metacharacters(self):
+        """Test every SendKeys metacharacter is escaped exactly once"""
+        text = "a+b^c%d~e(f)g{h}i"
+        with patch('subprocess.run', return_value=MagicMock(returncode=0)) as mock_run:
+            self.input.type_text(text)
+        
+        self.assertEqual(self._sendkeys_argument(mock_run),
+                         "a{+}b{^}c{%}d{~}e{(}f{)}g{{h}}i")
+
+
 class TestWindowsWindowManagement(unittest.TestCase):
     """Test window management operations on Windows"""
     
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Tests for X11 input tools driven through xdotool
+"""
+
+import unittest
+import os
+import sys
+from unittest.mock import patch, MagicMock
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+
+class TestX11InputCommands(unittest.TestCase):
+    """Test the xdotool command lines X11Input runs"""
+    
+    def setUp(self):
+        """Setup test environment"""
+        from mcp.input.x11 import X11Input
+        with patch('subprocess.run'):
+            self.input = X11Input()
+    
+    def test_drag_single_invocation(self):
+        """Test a drag is one chained xdotool process"""
+        with patch('subprocess.run', return_value=MagicMock(returncode=0)) as mock_run:
+            result = self.input.drag(10, 20, 300, 400)
+        
+        mock_run.assert_called_once_with(
+            ['xdotool',
+             'mousemove', '10', '20',
+             'mousedown', '1',
+             'sleep', '0.05',
+             'mousemove', '300', '400',
+             'mouseup', '1'],
+            check=True
+        )
+        self.assertEqual(result['start'], (10, 20))
+        self.assertEqual(result['end'], (300, 400))
+    
+    def test_scroll_uses_repeat(self):
+        """Test scrolling repeats the wheel click inside xdotool"""
+        with patch('subprocess.run', return_value=MagicMock(returncode=0)) as mock_run:
+            self.input.scroll('down', 3)
+            mock_run.assert_called_once_with(
+                ['xdotool', 'click', '--repeat', '3', '--delay', '50', '5'], check=True
+            )
+            
+            mock_run.reset_mock()
+            self.input.scroll('up', 1)
+            mock_run.assert_called_once_with(
+                ['xdotool', 'click', '--repeat', '1', '--delay', '50', '4'], check=True
+            )
+            
+            mock_run.reset_mock()
+            result = self.input.scroll('down', 0)
+            mock_run.assert_not_called()
+            self.assertTrue(result['success'])
+
+
+if __name__ == '__main__':
+    unittest.main()